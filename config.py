@@ -5,6 +5,7 @@ Central configuration for Gemini API, Isaac Sim paths, and simulation parameters
 """
 
 import os
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Any
 
@@ -22,9 +23,15 @@ EXAMPLES_DIR = PROJECT_ROOT / "examples"
 RENDERS_DIR = OUTPUT_DIR / "renders"
 USD_SCENES_DIR = OUTPUT_DIR / "usd_scenes"
 
-# Create directories
-for directory in [OUTPUT_DIR, EXAMPLES_DIR, RENDERS_DIR, USD_SCENES_DIR]:
-    directory.mkdir(parents=True, exist_ok=True)
+def ensure_output_dirs() -> None:
+    """
+    Create the project output directories on first use.
+
+    Called from entry points instead of at import time, so tools that never
+    write outputs don't pay the stat/mkdir syscalls on startup.
+    """
+    for directory in (OUTPUT_DIR, EXAMPLES_DIR, RENDERS_DIR, USD_SCENES_DIR):
+        directory.mkdir(parents=True, exist_ok=True)
 
 # Optional: Path to a manually created "Master Scene" USD file
 # If set (or passed via CLI), the system will apply variations to THIS file instead of generating one.
@@ -70,19 +77,35 @@ OLLAMA_TEMPERATURE = 0.1
 
 # Isaac Sim installation path (auto-detect or set manually)
 ISAAC_SIM_PATH = Path.home() / ".local/share/ov/pkg"
-ISAAC_SIM_PYTHON = None
 
-# Try to find Isaac Sim Python executable
-if ISAAC_SIM_PATH.exists():
+
+@lru_cache(maxsize=1)
+def get_isaac_python():
+    """
+    Locate the Isaac Sim Python executable (latest installed version).
+
+    Deferred and memoized so importing config doesn't pay a directory scan;
+    the glob runs once on first call.
+
+    Returns:
+        Path to python.sh, or None when Isaac Sim is not installed
+    """
+    if not ISAAC_SIM_PATH.exists():
+        print("⚠️  Isaac Sim path does not exist. Please install Isaac Sim.")
+        return None
+
     isaac_versions = sorted(ISAAC_SIM_PATH.glob("isaac_sim-*"))
-    if isaac_versions:
-        latest_isaac = isaac_versions[-1]
-        ISAAC_SIM_PYTHON = latest_isaac / "python.sh"
-        print(f"✓ Found Isaac Sim: {latest_isaac}")
-    else:
+    if not isaac_versions:
         print("⚠️  Isaac Sim not found in default location")
-else:
-    print("⚠️  Isaac Sim path does not exist. Please install Isaac Sim.")
+        return None
+
+    latest_isaac = isaac_versions[-1]
+    print(f"✓ Found Isaac Sim: {latest_isaac}")
+    return latest_isaac / "python.sh"
+
+# Concurrent Isaac Sim render processes. Each render is GPU/CPU-bound in
+# its own process, so the orchestrator only needs threads to babysit them.
+RENDER_PARALLELISM = int(os.getenv("RENDER_PARALLELISM", "2"))
 
 # Isaac Sim headless rendering settings
 ISAAC_HEADLESS = True
@@ -312,6 +335,15 @@ PHYSICS_JSON_SCHEMA = {
     }
 }
 
+# Compile the schema once into a specialized validator function.
+# fastjsonschema code-generates the checks instead of interpreting the
+# schema on every call; validation falls back to manual checks if absent.
+try:
+    import fastjsonschema
+    validate_physics_json = fastjsonschema.compile(PHYSICS_JSON_SCHEMA)
+except ImportError:
+    validate_physics_json = None
+
 # ============================================================================
 # LOGGING CONFIGURATION
 # ============================================================================
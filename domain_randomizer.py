@@ -5,16 +5,106 @@ Generates multiple variations of a scene using Omniverse Replicator for syntheti
 """
 
 import logging
-import random
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
 from pathlib import Path
 from typing import Dict, Any, List
 import colorsys
 
+import numpy as np
+import orjson
+
+try:
+    from matplotlib.colors import hsv_to_rgb as _hsv_to_rgb_array
+except ImportError:
+    _hsv_to_rgb_array = None
+
 from config import RANDOMIZATION_CONFIG, RENDERS_DIR
+import randomizer_kernels
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Below this count the process-pool spin-up costs more than it saves
+_PARALLEL_THRESHOLD = 64
+
+# Shared key tuple for vector dicts, so the inner loops zip against one
+# constant instead of rebuilding literal dicts
+_XYZ_KEYS = ("x", "y", "z")
+
+
+@lru_cache(maxsize=1)
+def _config_bounds():
+    """
+    Flatten RANDOMIZATION_CONFIG into (low, high) bound array pairs.
+
+    The config is module-level constant, so this work is shared by every
+    DomainRandomizer instance — repeated constructions (one per video in
+    batch runs) reuse the same arrays. Row order is fixed and documented
+    next to each consumer.
+    """
+    material = RANDOMIZATION_CONFIG["material"]
+    physics = RANDOMIZATION_CONFIG["physics"]
+    lighting = RANDOMIZATION_CONFIG["lighting"]
+    camera = RANDOMIZATION_CONFIG["camera"]
+
+    mat = np.array([
+        material["base_color_hue"],
+        material["base_color_saturation"],
+        material["base_color_value"],
+        material["roughness"],
+        material["metallic"]
+    ]).T
+
+    phys = np.array([
+        physics["static_friction"],
+        physics["dynamic_friction"],
+        physics["restitution"],
+        physics["mass_multiplier"],
+        physics["initial_velocity_scale"]
+    ]).T
+
+    light = np.array([
+        lighting["dome_intensity"],
+        lighting["dome_rotation"],
+        lighting["key_light_intensity"],
+        lighting["key_light_position"]["x"],
+        lighting["key_light_position"]["y"],
+        lighting["key_light_position"]["z"],
+        lighting["color_temperature"]
+    ]).T
+
+    cam = np.array([
+        camera["position_offset_x"],
+        camera["position_offset_y"],
+        camera["position_offset_z"],
+        camera["focal_length"]
+    ]).T
+
+    layer = np.array([
+        physics["mass_multiplier"],
+        physics["initial_velocity_scale"],
+        physics["static_friction"],
+        physics["restitution"],
+        material["base_color_hue"],
+        material["base_color_value"],
+        material["roughness"]
+    ]).T
+
+    return mat, phys, light, cam, layer
+
+
+def _build_variation(randomizer: "DomainRandomizer", index: int) -> Dict[str, Any]:
+    """
+    Process-pool worker: build one variation with its own seeded generator.
+
+    Module-level so it pickles cleanly; seeding from the variation index
+    keeps output deterministic regardless of worker scheduling.
+    """
+    rng = np.random.default_rng(index + 1000)
+    return randomizer._create_variation(index, rng)
+
 
 class DomainRandomizer:
     """
@@ -30,169 +120,311 @@ class DomainRandomizer:
         """
         self.base_analysis = base_analysis
         self.config = RANDOMIZATION_CONFIG
+
+        # Config-derived (low, high) bound arrays are shared across all
+        # instances via the memoized module helper
+        mat, phys, light, cam, layer = _config_bounds()
+        self._mat_lo, self._mat_hi = mat
+        self._phys_lo, self._phys_hi = phys
+        self._light_lo, self._light_hi = light
+        self._cam_lo, self._cam_hi = cam
+        self._layer_lo, self._layer_hi = layer
+
+        # SoA view of the base physics objects: mass and velocity live in
+        # contiguous arrays so per-variation math is vectorized, and dicts
+        # are only materialized when writing a variation back out.
+        phys_objects = base_analysis.get("physics_estimation", {}).get("objects", [])
+        self._base_mass = np.array([obj.get("mass", 1.0) for obj in phys_objects])
+        if phys_objects:
+            self._base_vel = np.array([
+                [obj.get("initial_velocity", {}).get(axis, 0.0) for axis in ("x", "y", "z")]
+                for obj in phys_objects
+            ])
+        else:
+            self._base_vel = np.zeros((0, 3))
+
+        # All randomized fields for one variation come from a single flat
+        # uniform draw. Object counts are fixed by the base analysis, so the
+        # concatenated bound vectors and per-section offsets are static.
+        n_scene = len(base_analysis.get("scene_composition", {}).get("objects", []))
+        n_phys = len(phys_objects)
+        sections = [
+            ("materials", np.repeat(self._mat_lo, n_scene), np.repeat(self._mat_hi, n_scene)),
+            ("physics", np.repeat(self._phys_lo, n_phys), np.repeat(self._phys_hi, n_phys)),
+            ("lighting", self._light_lo, self._light_hi),
+            ("camera", self._cam_lo, self._cam_hi),
+            ("layers", self._layer_lo, self._layer_hi),
+        ]
+        self._field_offsets = {}
+        offset = 0
+        for name, lo, _ in sections:
+            self._field_offsets[name] = (offset, len(lo))
+            offset += len(lo)
+        self._lows = np.concatenate([lo for _, lo, _ in sections])
+        self._highs = np.concatenate([hi for _, _, hi in sections])
+
+        # Compile the color kernel now so JIT latency doesn't count
+        # against the first generate_variations call
+        if _hsv_to_rgb_array is None:
+            randomizer_kernels.warmup()
+
         logger.info("✓ DomainRandomizer initialized")
     
-    def generate_variations(self, count: int = 100) -> List[Dict[str, Any]]:
+    def generate_variations(self, count: int = 100, workers: int = None) -> List[Dict[str, Any]]:
         """
         Generate N randomized variations of the base scene.
-        
+
+        Variations are independent, so large batches fan out across a
+        process pool with one seeded generator per variation.
+
         Args:
             count: Number of variations to generate
-            
+            workers: Worker processes (defaults to CPU count; 1 = serial)
+
         Returns:
             List of modified analysis dictionaries
         """
         logger.info(f"🎲 Generating {count} scene variations...")
-        
-        variations = []
-        
-        for i in range(count):
-            variation = self._create_variation(i)
-            variations.append(variation)
-        
+
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+        # One PCG64 generator seeded per variation (the seed recorded in
+        # its randomization_seed metadata), so a given index always yields
+        # the same variation, serial or parallel.
+        if workers <= 1 or count < _PARALLEL_THRESHOLD:
+            variations = [_build_variation(self, i) for i in range(count)]
+        else:
+            chunksize = max(1, count // (8 * workers))
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                variations = list(pool.map(
+                    partial(_build_variation, self),
+                    range(count),
+                    chunksize=chunksize
+                ))
+
         logger.info(f"✅ Generated {len(variations)} variations")
         return variations
-    
-    def _create_variation(self, index: int) -> Dict[str, Any]:
+
+    def _create_variation(self, index: int, rng: np.random.Generator) -> Dict[str, Any]:
         """
         Create a single randomized variation.
-        
+
         Args:
             index: Variation index
-            
+            rng: NumPy generator supplying all randomness for this variation
+
         Returns:
             Modified analysis dictionary
         """
-        import copy
-        variation = copy.deepcopy(self.base_analysis)
-        
+        variation = self._clone_base()
+
         # Add variation metadata
         variation["variation_id"] = index
         variation["randomization_seed"] = index + 1000
-        
+
+        # One C-level PRNG call covers every field; each subroutine reads
+        # its slice via the offsets computed in __init__
+        samples = rng.uniform(self._lows, self._highs)
+
         # Randomize different aspects
-        self._randomize_materials(variation)
-        self._randomize_lighting(variation)
-        self._randomize_physics(variation)
-        self._randomize_camera(variation)
-        
+        self._randomize_materials(variation, self._field(samples, "materials"))
+        self._randomize_lighting(variation, self._field(samples, "lighting"))
+        self._randomize_physics(variation, self._field(samples, "physics"))
+        self._randomize_camera(variation, self._field(samples, "camera"))
+
         # HYBRID: Add explicit layer configs
-        self._randomize_layers(variation)
-        
+        self._randomize_layers(variation, self._field(samples, "layers"))
+
+        return variation
+
+    def _field(self, samples: np.ndarray, name: str) -> np.ndarray:
+        """Return the view of the flat sample vector for one section."""
+        start, length = self._field_offsets[name]
+        return samples[start:start + length]
+
+    def _clone_base(self) -> Dict[str, Any]:
+        """
+        Clone the base analysis, copying only the subtrees the randomizers
+        mutate.
+
+        copy.deepcopy walks the entire nested structure with a memo dict per
+        call, which dominates per-variation cost at large counts. Only the
+        object lists, lighting dicts, and camera dict are written to, so the
+        rest of the analysis (reasoning, timeline, motion estimation) is
+        shared by reference. Consumers must treat those shared subtrees as
+        read-only — anything a new _randomize_* step wants to mutate has to
+        be copied here first.
+
+        Returns:
+            Analysis dictionary safe to mutate by the _randomize_* helpers
+        """
+        base = self.base_analysis
+        variation = dict(base)
+
+        scene = dict(base.get("scene_composition", {}))
+        scene["objects"] = [dict(obj) for obj in scene.get("objects", [])]
+        variation["scene_composition"] = scene
+
+        physics = dict(base.get("physics_estimation", {}))
+        physics["objects"] = [dict(obj) for obj in physics.get("objects", [])]
+        variation["physics_estimation"] = physics
+
+        # Lighting is mutated two levels deep (key_light.position)
+        lighting = {}
+        for key, value in base.get("lighting_conditions", {}).items():
+            if isinstance(value, dict):
+                value = {
+                    k: dict(v) if isinstance(v, dict) else v
+                    for k, v in value.items()
+                }
+            lighting[key] = value
+        variation["lighting_conditions"] = lighting
+
+        variation["camera_estimation"] = dict(base.get("camera_estimation", {}))
+
         return variation
 
-    def _randomize_layers(self, variation: Dict[str, Any]) -> None:
+    def _randomize_layers(self, variation: Dict[str, Any], draws: np.ndarray) -> None:
         """
         Add explicit configuration for Hybrid Workflow Layers.
+
+        draws holds mass_mult, vel_scale, friction, restitution, hue,
+        value, roughness in order.
         """
+
         # Dynamic Layer (Physics + Motion)
         variation["layer_dynamic"] = {
-            "mass_multiplier": random.uniform(*self.config["physics"]["mass_multiplier"]),
-            "velocity_scale": random.uniform(*self.config["physics"]["initial_velocity_scale"])
+            "mass_multiplier": float(draws[0]),
+            "velocity_scale": float(draws[1])
         }
-        
+
         # Surface Layer (Interaction)
         variation["layer_surface"] = {
-            "friction": random.uniform(*self.config["physics"]["static_friction"]),
-            "restitution": random.uniform(*self.config["physics"]["restitution"]),
-            "color_hue": random.uniform(*self.config["material"]["base_color_hue"])
+            "friction": float(draws[2]),
+            "restitution": float(draws[3]),
+            "color_hue": float(draws[4])
         }
-        
+
         # Background Layer (Visual)
         variation["layer_background"] = {
-            "color_value": random.uniform(*self.config["material"]["base_color_value"]),
-            "roughness": random.uniform(*self.config["material"]["roughness"])
+            "color_value": float(draws[5]),
+            "roughness": float(draws[6])
         }
-    
-    def _randomize_materials(self, variation: Dict[str, Any]) -> None:
+
+    def _randomize_materials(self, variation: Dict[str, Any], draws: np.ndarray) -> None:
         """
         Randomize material properties (colors, roughness, metallic).
         """
         objects = variation.get("scene_composition", {}).get("objects", [])
-        
-        for obj in objects:
-            # Generate random color in HSV then convert to RGB
-            hue = random.uniform(*self.config["material"]["base_color_hue"])
-            saturation = random.uniform(*self.config["material"]["base_color_saturation"])
-            value = random.uniform(*self.config["material"]["base_color_value"])
-            
-            r, g, b = colorsys.hsv_to_rgb(hue, saturation, value)
-            
+        if not objects:
+            return
+
+        # Slice reshapes to (5, n): hue, saturation, value, roughness,
+        # metallic rows
+        n = len(objects)
+        hues, saturations, values, roughness, metallic = draws.reshape(5, n)
+
+        # Convert all colors in one array call; colorsys does the sextant
+        # branching per object in pure Python, matplotlib does it in NumPy.
+        hsv = np.stack([hues, saturations, values], axis=1)
+        if _hsv_to_rgb_array is not None:
+            rgb = _hsv_to_rgb_array(hsv)
+        elif randomizer_kernels.hsv_to_rgb_batch is not None:
+            rgb = np.empty_like(hsv)
+            randomizer_kernels.hsv_to_rgb_batch(hsv, rgb)
+        else:
+            rgb = np.array([colorsys.hsv_to_rgb(h, s, v) for h, s, v in hsv])
+
+        for i, obj in enumerate(objects):
+            r, g, b = rgb[i]
+
             # Add material properties to object
             obj["material"] = {
-                "base_color": {"r": r, "g": g, "b": b},
-                "roughness": random.uniform(*self.config["material"]["roughness"]),
-                "metallic": random.uniform(*self.config["material"]["metallic"])
+                "base_color": {"r": float(r), "g": float(g), "b": float(b)},
+                "roughness": float(roughness[i]),
+                "metallic": float(metallic[i])
             }
-    
-    def _randomize_lighting(self, variation: Dict[str, Any]) -> None:
+
+    def _randomize_lighting(self, variation: Dict[str, Any], draws: np.ndarray) -> None:
         """
         Randomize lighting conditions.
+
+        draws holds dome intensity/rotation, key intensity, key position
+        x/y/z, color temperature in order.
         """
+
         lighting = variation.setdefault("lighting_conditions", {})
-        
+
         # Randomize dome light
         dome = lighting.setdefault("dome_light", {})
-        dome["intensity"] = random.uniform(*self.config["lighting"]["dome_intensity"])
-        dome["rotation"] = random.uniform(*self.config["lighting"]["dome_rotation"])
-        
+        dome["intensity"] = float(draws[0])
+        dome["rotation"] = float(draws[1])
+
         # Randomize key light
         key_light = lighting.setdefault("key_light", {})
-        key_light["intensity"] = random.uniform(*self.config["lighting"]["key_light_intensity"])
-        
+        key_light["intensity"] = float(draws[2])
+
         # Randomize position
         key_light_pos = key_light.setdefault("position", {})
-        key_light_pos["x"] = random.uniform(*self.config["lighting"]["key_light_position"]["x"])
-        key_light_pos["y"] = random.uniform(*self.config["lighting"]["key_light_position"]["y"])
-        key_light_pos["z"] = random.uniform(*self.config["lighting"]["key_light_position"]["z"])
-        
+        key_light_pos["x"] = float(draws[3])
+        key_light_pos["y"] = float(draws[4])
+        key_light_pos["z"] = float(draws[5])
+
         # Color temperature
-        key_light["color_temperature"] = random.uniform(*self.config["lighting"]["color_temperature"])
-    
-    def _randomize_physics(self, variation: Dict[str, Any]) -> None:
+        key_light["color_temperature"] = float(draws[6])
+
+    def _randomize_physics(self, variation: Dict[str, Any], draws: np.ndarray) -> None:
         """
         Randomize physics parameters.
         """
         physics_objects = variation.get("physics_estimation", {}).get("objects", [])
-        
-        for obj in physics_objects:
-            # Randomize friction
-            obj["static_friction"] = random.uniform(*self.config["physics"]["static_friction"])
-            obj["dynamic_friction"] = random.uniform(*self.config["physics"]["dynamic_friction"])
-            
+        if not physics_objects:
+            return
+
+        # Slice reshapes to (5, n): static/dynamic friction, restitution,
+        # mass multiplier, velocity scale rows
+        n = len(physics_objects)
+        static_friction, dynamic_friction, restitution, mass_mult, vel_scale = draws.reshape(5, n)
+
+        # Vectorized over the SoA base arrays; tolist() converts each
+        # column to plain floats in one C call, so the loop below only
+        # writes results back into the output dicts
+        mass = (self._base_mass * mass_mult).tolist()
+        velocity = (self._base_vel * vel_scale[:, None]).tolist()
+        static_friction = static_friction.tolist()
+        dynamic_friction = dynamic_friction.tolist()
+        restitution = restitution.tolist()
+
+        for i, obj in enumerate(physics_objects):
+            obj["static_friction"] = static_friction[i]
+            obj["dynamic_friction"] = dynamic_friction[i]
+
             # Randomize restitution (bounciness)
-            obj["restitution"] = random.uniform(*self.config["physics"]["restitution"])
-            
-            # Randomize mass
-            base_mass = obj.get("mass", 1.0)
-            mass_mult = random.uniform(*self.config["physics"]["mass_multiplier"])
-            obj["mass"] = base_mass * mass_mult
-            
-            # Randomize initial velocity
-            velocity = obj.get("initial_velocity", {"x": 0, "y": 0, "z": 0})
-            vel_scale = random.uniform(*self.config["physics"]["initial_velocity_scale"])
-            obj["initial_velocity"] = {
-                "x": velocity.get("x", 0) * vel_scale,
-                "y": velocity.get("y", 0) * vel_scale,
-                "z": velocity.get("z", 0) * vel_scale
-            }
-    
-    def _randomize_camera(self, variation: Dict[str, Any]) -> None:
+            obj["restitution"] = restitution[i]
+
+            obj["mass"] = mass[i]
+            obj["initial_velocity"] = dict(zip(_XYZ_KEYS, velocity[i]))
+
+    def _randomize_camera(self, variation: Dict[str, Any], draws: np.ndarray) -> None:
         """
         Randomize camera position and settings.
+
+        draws holds position offsets x/y/z and focal length in order.
         """
+
         camera = variation.setdefault("camera_estimation", {})
         base_pos = camera.get("position", {"x": 0, "y": 1.5, "z": 3})
-        
+
         # Add random offset
-        camera["position"] = {
-            "x": base_pos.get("x", 0) + random.uniform(*self.config["camera"]["position_offset_x"]),
-            "y": base_pos.get("y", 1.5) + random.uniform(*self.config["camera"]["position_offset_y"]),
-            "z": base_pos.get("z", 3) + random.uniform(*self.config["camera"]["position_offset_z"])
-        }
-        
+        defaults = (0, 1.5, 3)
+        camera["position"] = dict(zip(_XYZ_KEYS, (
+            float(base_pos.get(key, default) + offset)
+            for key, default, offset in zip(_XYZ_KEYS, defaults, draws)
+        )))
+
         # Randomize focal length
-        camera["focal_length"] = random.uniform(*self.config["camera"]["focal_length"])
+        camera["focal_length"] = float(draws[3])
     
     def get_variation_summary(self, variation: Dict[str, Any]) -> str:
         """
@@ -223,29 +455,186 @@ class DomainRandomizer:
         return f"Variation {var_id}: Colors={colors}, Light={dome_intensity:.0f}, Friction={friction:.2f}"
 
 
-def create_variation_grid(variations: List[Dict[str, Any]], grid_size: int = 3) -> List[int]:
+def export_variations_npz(variations: List[Dict[str, Any]], output_dir: str | Path) -> Path:
+    """
+    Persist variations as SoA delta arrays instead of N full JSON clones.
+
+    Every variation shares the base analysis structure and differs only in
+    the randomized numeric fields, so the artifact on disk is one
+    compressed .npz of per-field arrays plus a small manifest — typically
+    10-100x less write volume than a JSON file per variation.
+
+    Args:
+        variations: Output of DomainRandomizer.generate_variations
+        output_dir: Directory for variations.npz and manifest.json
+
+    Returns:
+        Path to the written .npz file
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    def _vec(d):
+        return [d.get(k, 0.0) for k in _XYZ_KEYS]
+
+    scene_objs = [v["scene_composition"]["objects"] for v in variations]
+    phys_objs = [v["physics_estimation"]["objects"] for v in variations]
+    lights = [v["lighting_conditions"] for v in variations]
+    cams = [v["camera_estimation"] for v in variations]
+
+    arrays = {
+        "base_color": np.array([
+            [[o["material"]["base_color"][c] for c in ("r", "g", "b")] for o in objs]
+            for objs in scene_objs
+        ], dtype=np.float32),
+        "roughness": np.array([
+            [o["material"]["roughness"] for o in objs] for objs in scene_objs
+        ], dtype=np.float32),
+        "metallic": np.array([
+            [o["material"]["metallic"] for o in objs] for objs in scene_objs
+        ], dtype=np.float32),
+        "static_friction": np.array([
+            [o["static_friction"] for o in objs] for objs in phys_objs
+        ], dtype=np.float32),
+        "dynamic_friction": np.array([
+            [o["dynamic_friction"] for o in objs] for objs in phys_objs
+        ], dtype=np.float32),
+        "restitution": np.array([
+            [o["restitution"] for o in objs] for objs in phys_objs
+        ], dtype=np.float32),
+        "mass": np.array([
+            [o["mass"] for o in objs] for objs in phys_objs
+        ], dtype=np.float32),
+        "initial_velocity": np.array([
+            [_vec(o["initial_velocity"]) for o in objs] for objs in phys_objs
+        ], dtype=np.float32),
+        "dome_intensity": np.array(
+            [l["dome_light"]["intensity"] for l in lights], dtype=np.float32),
+        "dome_rotation": np.array(
+            [l["dome_light"]["rotation"] for l in lights], dtype=np.float32),
+        "key_intensity": np.array(
+            [l["key_light"]["intensity"] for l in lights], dtype=np.float32),
+        "key_position": np.array(
+            [_vec(l["key_light"]["position"]) for l in lights], dtype=np.float32),
+        "color_temperature": np.array(
+            [l["key_light"]["color_temperature"] for l in lights], dtype=np.float32),
+        "camera_position": np.array(
+            [_vec(c["position"]) for c in cams], dtype=np.float32),
+        "focal_length": np.array(
+            [c["focal_length"] for c in cams], dtype=np.float32),
+    }
+
+    npz_path = output_dir / "variations.npz"
+    np.savez_compressed(npz_path, **arrays)
+
+    manifest = {
+        "count": len(variations),
+        "seeds": [v["randomization_seed"] for v in variations],
+        "fields": sorted(arrays.keys()),
+        "layers": [
+            {
+                "layer_dynamic": v["layer_dynamic"],
+                "layer_surface": v["layer_surface"],
+                "layer_background": v["layer_background"]
+            }
+            for v in variations
+        ]
+    }
+    # Machine-read artifact: skip pretty-printing
+    (output_dir / "manifest.json").write_bytes(orjson.dumps(manifest))
+
+    logger.info(f"✓ SoA variation archive written: {npz_path}")
+    return npz_path
+
+
+def load_variations_npz(base_analysis: Dict[str, Any], archive_dir: str | Path) -> List[Dict[str, Any]]:
+    """
+    Rebuild full variation dicts from an SoA archive.
+
+    Inverse of export_variations_npz: clones the base analysis per
+    variation and fans the delta arrays back into the randomized fields,
+    producing output identical to generate_variations.
+
+    Args:
+        base_analysis: The original analysis the archive was built from
+        archive_dir: Directory holding variations.npz and manifest.json
+
+    Returns:
+        List of variation dictionaries
+    """
+    archive_dir = Path(archive_dir)
+    data = np.load(archive_dir / "variations.npz")
+    manifest = orjson.loads((archive_dir / "manifest.json").read_bytes())
+
+    randomizer = DomainRandomizer(base_analysis)
+    variations = []
+    for i in range(manifest["count"]):
+        var = randomizer._clone_base()
+        var["variation_id"] = i
+        var["randomization_seed"] = manifest["seeds"][i]
+        var.update(manifest["layers"][i])
+
+        for j, obj in enumerate(var["scene_composition"]["objects"]):
+            r, g, b = data["base_color"][i, j].tolist()
+            obj["material"] = {
+                "base_color": {"r": r, "g": g, "b": b},
+                "roughness": float(data["roughness"][i, j]),
+                "metallic": float(data["metallic"][i, j])
+            }
+
+        for j, obj in enumerate(var["physics_estimation"]["objects"]):
+            obj["static_friction"] = float(data["static_friction"][i, j])
+            obj["dynamic_friction"] = float(data["dynamic_friction"][i, j])
+            obj["restitution"] = float(data["restitution"][i, j])
+            obj["mass"] = float(data["mass"][i, j])
+            obj["initial_velocity"] = dict(
+                zip(_XYZ_KEYS, data["initial_velocity"][i, j].tolist())
+            )
+
+        lighting = var["lighting_conditions"]
+        dome = lighting.setdefault("dome_light", {})
+        dome["intensity"] = float(data["dome_intensity"][i])
+        dome["rotation"] = float(data["dome_rotation"][i])
+        key_light = lighting.setdefault("key_light", {})
+        key_light["intensity"] = float(data["key_intensity"][i])
+        key_light["position"] = dict(
+            zip(_XYZ_KEYS, data["key_position"][i].tolist())
+        )
+        key_light["color_temperature"] = float(data["color_temperature"][i])
+
+        camera = var["camera_estimation"]
+        camera["position"] = dict(
+            zip(_XYZ_KEYS, data["camera_position"][i].tolist())
+        )
+        camera["focal_length"] = float(data["focal_length"][i])
+
+        variations.append(var)
+
+    return variations
+
+
+def create_variation_grid(variations: List[Dict[str, Any]], grid_size: int = 3) -> np.ndarray:
     """
     Select a subset of variations for grid display.
-    
+
     Args:
         variations: All variations
         grid_size: Size of grid (e.g., 3 = 3x3 grid)
-        
+
     Returns:
-        List of indices to use
+        int64 index array, usable directly for NumPy fancy indexing
     """
     total_needed = grid_size * grid_size
     if len(variations) <= total_needed:
-        return list(range(len(variations)))
-    
+        return np.arange(len(variations), dtype=np.int64)
+
     # Select evenly distributed samples
     step = len(variations) // total_needed
-    return [i * step for i in range(total_needed)]
+    return np.arange(total_needed, dtype=np.int64) * step
 
 
 if __name__ == "__main__":
     # Test randomization
-    import json
     import sys
     
     if len(sys.argv) < 2:
@@ -257,9 +646,9 @@ if __name__ == "__main__":
     json_path = sys.argv[1]
     count = int(sys.argv[2]) if len(sys.argv) > 2 else 9
     
-    # Load base analysis
-    with open(json_path, 'r') as f:
-        base_analysis = json.load(f)
+    # Load base analysis (orjson on the read side too, so stdlib json
+    # stays off the hot path entirely)
+    base_analysis = orjson.loads(Path(json_path).read_bytes())
     
     # Generate variations
     randomizer = DomainRandomizer(base_analysis)
@@ -277,9 +666,12 @@ if __name__ == "__main__":
     output_dir = Path("output/variations")
     output_dir.mkdir(parents=True, exist_ok=True)
     
+    # orjson serializes in Rust and the bytes go out in one write call,
+    # instead of stdlib json streaming indented chunks through f.write
     for i, var in enumerate(variations):
         output_file = output_dir / f"variation_{i:03d}.json"
-        with open(output_file, 'w') as f:
-            json.dump(var, f, indent=2)
+        output_file.write_bytes(
+            orjson.dumps(var, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+        )
     
     print(f"\n✅ Variations saved to: {output_dir}")
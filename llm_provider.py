@@ -5,7 +5,12 @@ Defines the abstract base class and concrete implementations for different AI pr
 (Gemini, Ollama) to support the Dual-Engine Architecture.
 """
 
+import datetime
+import hashlib
+import mimetypes
+import mmap
 from abc import ABC, abstractmethod
+from functools import lru_cache
 from typing import Dict, Any, Optional
 from pathlib import Path
 import json
@@ -14,16 +19,42 @@ import time
 import os
 
 # Import provider libraries
-try:
-    import google.generativeai as genai
-except ImportError:
-    genai = None
-
 try:
     import ollama
 except ImportError:
     ollama = None
 
+# The Gemini SDK drags in gRPC and protobuf (~hundreds of MB of
+# transitive modules), so it's imported on first provider construction
+# instead of at module import — cache-hit runs, --help, and Ollama-only
+# configurations never pay for it.
+genai = None
+
+# Transient Gemini API failures worth retrying (5xx / 429 / timeouts);
+# populated alongside the SDK import.
+_RETRYABLE_ERRORS = ()
+
+
+def _lazy_genai():
+    """Import google.generativeai on first use; returns None if missing."""
+    global genai, _RETRYABLE_ERRORS
+    if genai is None:
+        try:
+            import google.generativeai
+        except ImportError:
+            return None
+        genai = google.generativeai
+        try:
+            from google.api_core import exceptions as gapi_exceptions
+            _RETRYABLE_ERRORS = (
+                gapi_exceptions.ServiceUnavailable,
+                gapi_exceptions.ResourceExhausted,
+                gapi_exceptions.DeadlineExceeded,
+            )
+        except ImportError:
+            pass
+    return genai
+
 from config import (
     GEMINI_API_KEY,
     GEMINI_MODEL,
@@ -33,25 +64,48 @@ from config import (
     OLLAMA_BASE_URL,
     OLLAMA_VISION_MODEL,
     OLLAMA_CODE_MODEL,
-    OLLAMA_TEMPERATURE
+    OLLAMA_TEMPERATURE,
+    OUTPUT_DIR
 )
 
 logger = logging.getLogger(__name__)
 
+
+def _with_retry(fn, *args, attempts=3, **kwargs):
+    """
+    Call fn, retrying transient API errors with exponential backoff.
+
+    A 429 or 5xx mid-pipeline otherwise aborts the whole analysis and
+    forces a re-upload. Sleeps 2**attempt seconds between tries;
+    non-transient errors and the final failure propagate unchanged.
+    """
+    for attempt in range(attempts):
+        try:
+            return fn(*args, **kwargs)
+        except _RETRYABLE_ERRORS as e:
+            if attempt == attempts - 1:
+                raise
+            delay = 2 ** attempt
+            logger.warning(f"⚠️  Transient API error ({e}); retrying in {delay}s")
+            time.sleep(delay)
+
+
 class LLMProvider(ABC):
     """
     Abstract base class for LLM providers.
     """
     
     @abstractmethod
-    def generate_text(self, prompt: str, system_instruction: str = None) -> str:
+    def generate_text(self, prompt: str, system_instruction: str = None, cache_system: bool = False) -> str:
         """
         Generate text/code from a prompt.
-        
+
         Args:
             prompt: User prompt
             system_instruction: System prompt/context
-            
+            cache_system: Hint that the system instruction is a stable prefix
+                the provider may cache server-side across calls
+
         Returns:
             Generated text string
         """
@@ -76,62 +130,237 @@ class GeminiProvider(LLMProvider):
     """
     Implementation for Google's Gemini API.
     """
-    
+
+    # The Files API keeps uploads for 48h; renew an hour early so a
+    # handle never expires between the lookup and the inference call
+    _FILE_TTL = 47 * 3600
+
     def __init__(self):
         if not GEMINI_API_KEY:
             raise ValueError("GEMINI_API_KEY not set")
-        if genai is None:
+        if _lazy_genai() is None:
             raise ImportError("google-generativeai not installed")
-            
-        genai.configure(api_key=GEMINI_API_KEY)
-        logger.info("✓ GeminiProvider initialized")
 
-    def generate_text(self, prompt: str, system_instruction: str = None) -> str:
-        model = genai.GenerativeModel(
-            model_name=GEMINI_CODE_MODEL,
+        genai.configure(api_key=GEMINI_API_KEY)
+        self._content_caches = {}  # system_instruction -> CachedContent model
+        self._video_caches = {}  # analysis prompt -> CachedContent video model
+        # Model instances are reusable across calls; construction re-parses
+        # config (and can hit the network for metadata on some SDK versions),
+        # so the video model is built once and text models are keyed by
+        # their system instruction (construction-time in this SDK).
+        self._text_models = {}
+        self._video_model = genai.GenerativeModel(
+            model_name=GEMINI_MODEL,
             generation_config={
-                "temperature": GEMINI_CODE_TEMPERATURE,
-                "response_mime_type": "text/plain"
-            },
-            system_instruction=system_instruction
+                "temperature": GEMINI_TEMPERATURE,
+                "response_mime_type": "application/json"
+            }
         )
-        
+        # Server-side file handles keyed by video content hash: a re-run
+        # with a tweaked prompt misses the analysis cache but can still
+        # reuse the upload while Gemini holds the file
+        self._registry_path = OUTPUT_DIR / ".gemini_files.json"
+        self._uploads = self._load_upload_registry()
+        logger.info("✓ GeminiProvider initialized")
+
+    def generate_text(self, prompt: str, system_instruction: str = None, cache_system: bool = False) -> str:
+        if cache_system and system_instruction:
+            model = self._cached_system_model(system_instruction)
+            if model is not None:
+                try:
+                    response = _with_retry(model.generate_content, prompt)
+                    return response.text
+                except Exception as e:
+                    # The server-side cache can expire mid-run; drop it so
+                    # the next call rebuilds, and fall through to the
+                    # per-call system-instruction model
+                    logger.warning(f"⚠️  Cached-content call failed ({e}); retrying without cache")
+                    self._content_caches.pop(system_instruction, None)
+
+        model = self._text_models.get(system_instruction)
+
+        if model is None:
+            model = genai.GenerativeModel(
+                model_name=GEMINI_CODE_MODEL,
+                generation_config={
+                    "temperature": GEMINI_CODE_TEMPERATURE,
+                    "response_mime_type": "text/plain"
+                },
+                system_instruction=system_instruction
+            )
+            self._text_models[system_instruction] = model
+
         try:
-            response = model.generate_content(prompt)
+            response = _with_retry(model.generate_content, prompt)
             return response.text
         except Exception as e:
             logger.error(f"Gemini text generation failed: {e}")
             raise
 
+    def _cached_system_model(self, system_instruction: str):
+        """
+        Get a model backed by server-side CachedContent for the instruction.
+
+        The cached prefix lets Gemini skip re-prefilling the static system
+        prompt on every call. Returns None when explicit caching is
+        unavailable (old SDK, prefix below the minimum cacheable size),
+        in which case the caller uses the regular per-call path.
+        """
+        if system_instruction in self._content_caches:
+            return self._content_caches[system_instruction]
+
+        try:
+            from google.generativeai import caching
+            cached_content = caching.CachedContent.create(
+                model=GEMINI_CODE_MODEL,
+                system_instruction=system_instruction,
+                ttl=datetime.timedelta(hours=1)
+            )
+            model = genai.GenerativeModel.from_cached_content(
+                cached_content,
+                generation_config={
+                    "temperature": GEMINI_CODE_TEMPERATURE,
+                    "response_mime_type": "text/plain"
+                }
+            )
+        except Exception as e:
+            logger.debug(f"Prompt caching unavailable, using per-call system prompt: {e}")
+            model = None
+
+        self._content_caches[system_instruction] = model
+        return model
+
+    def _cached_video_model(self, prompt: str):
+        """
+        Get a video model backed by server-side CachedContent for the prompt.
+
+        The physics analysis prompt is large and identical across calls;
+        caching it server-side means the prompt tokens are billed and
+        prefilled once per TTL instead of per video. Returns None when
+        explicit caching is unavailable (old SDK, prompt below the
+        minimum cacheable size).
+        """
+        if prompt in self._video_caches:
+            return self._video_caches[prompt]
+
+        try:
+            from google.generativeai import caching
+            cached_content = caching.CachedContent.create(
+                model=GEMINI_MODEL,
+                system_instruction=prompt,
+                ttl=datetime.timedelta(hours=1)
+            )
+            model = genai.GenerativeModel.from_cached_content(
+                cached_content,
+                generation_config={
+                    "temperature": GEMINI_TEMPERATURE,
+                    "response_mime_type": "application/json"
+                }
+            )
+        except Exception as e:
+            logger.debug(f"Video prompt caching unavailable, sending prompt per call: {e}")
+            model = None
+
+        self._video_caches[prompt] = model
+        return model
+
+    def _load_upload_registry(self) -> Dict[str, Any]:
+        """Read the persisted handle registry, dropping expired entries."""
+        try:
+            with open(self._registry_path, 'r', encoding='utf-8') as f:
+                registry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError, OSError):
+            return {}
+        now = time.time()
+        return {k: v for k, v in registry.items() if v.get("expires_at", 0) > now}
+
+    def _save_upload_registry(self) -> None:
+        try:
+            self._registry_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self._registry_path, 'w', encoding='utf-8') as f:
+                json.dump(self._uploads, f)
+        except OSError as e:
+            logger.debug(f"Could not persist upload registry: {e}")
+
+    @staticmethod
+    def _video_key(video_path: Path) -> str:
+        """Content hash identifying a video in the upload registry."""
+        h = hashlib.blake2b(digest_size=16)
+        with open(video_path, 'rb') as f:
+            try:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    h.update(mm)
+            except (ValueError, OSError):
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    h.update(chunk)
+        return h.hexdigest()
+
     def analyze_video(self, video_path: str | Path, prompt: str) -> str:
         video_path = Path(video_path)
-        
-        # Initialize model
-        model = genai.GenerativeModel(
-            model_name=GEMINI_MODEL,
-            generation_config={
-                "temperature": GEMINI_TEMPERATURE,
-                "response_mime_type": "application/json"
+
+        # Same bytes uploaded within the last ~47h: fetch the existing
+        # server-side handle instead of re-uploading. This is what makes
+        # prompt iteration cheap — a prompt change invalidates the
+        # analysis cache but not the upload.
+        key = self._video_key(video_path)
+        video_file = None
+        entry = self._uploads.get(key)
+        if entry is not None and entry.get("expires_at", 0) > time.time():
+            try:
+                video_file = genai.get_file(entry["name"])
+                if video_file.state.name == "FAILED":
+                    video_file = None
+            except Exception:
+                video_file = None  # deleted server-side; re-upload
+            if video_file is not None:
+                logger.info("♻️  Reusing server-side upload: %s", entry["name"])
+
+        if video_file is None:
+            logger.info("⏳ Uploading to Gemini API...")
+            # The Files API upload is already chunked+resumable in this SDK;
+            # passing the mime type explicitly skips content sniffing
+            mime_type = mimetypes.guess_type(video_path.name)[0] or "video/mp4"
+            video_file = _with_retry(genai.upload_file, str(video_path), mime_type=mime_type)
+            self._uploads[key] = {
+                "name": video_file.name,
+                "expires_at": time.time() + self._FILE_TTL
             }
-        )
-        
-        logger.info("⏳ Uploading to Gemini API...")
-        video_file = genai.upload_file(str(video_path))
-        
-        # Wait for processing
+            self._save_upload_registry()
+
+        # Wait for processing with exponential backoff: short clips finish
+        # in well under a second, long ones shouldn't be polled every second.
+        sleep = 0.1
         while video_file.state.name == "PROCESSING":
-            time.sleep(1)
-            video_file = genai.get_file(video_file.name)
-            
+            time.sleep(sleep)
+            sleep = min(4.0, sleep * 1.5)
+            video_file = _with_retry(genai.get_file, video_file.name)
+
         if video_file.state.name == "FAILED":
             raise RuntimeError("Video processing failed")
-            
+
         logger.info("🤖 Running Gemini analysis...")
-        response = model.generate_content(
+        model = self._cached_video_model(prompt)
+        if model is not None:
+            try:
+                response = _with_retry(
+                    model.generate_content,
+                    [video_file],
+                    request_options={"timeout": 600} # Increased timeout for video
+                )
+                return response.text
+            except Exception as e:
+                # The server-side cache can expire mid-run; drop it so the
+                # next call rebuilds, and fall through to the uncached path
+                logger.warning(f"⚠️  Cached-content call failed ({e}); retrying without cache")
+                self._video_caches.pop(prompt, None)
+
+        # Prompt first, so Gemini's implicit prefix caching can still hit
+        response = _with_retry(
+            self._video_model.generate_content,
             [prompt, video_file],
             request_options={"timeout": 600} # Increased timeout for video
         )
-        
+
         return response.text
 
 
@@ -152,9 +381,12 @@ class OllamaProvider(LLMProvider):
             
         logger.info(f"✓ OllamaProvider initialized (Vision: {OLLAMA_VISION_MODEL}, Code: {OLLAMA_CODE_MODEL})")
 
-    def generate_text(self, prompt: str, system_instruction: str = None) -> str:
+    def generate_text(self, prompt: str, system_instruction: str = None, cache_system: bool = False) -> str:
         """
         Uses standard chat completion.
+
+        cache_system is accepted for interface parity; Ollama reuses the
+        prompt KV cache automatically while the model stays loaded.
         """
         messages = []
         if system_instruction:
@@ -173,34 +405,72 @@ class OllamaProvider(LLMProvider):
             logger.error(f"Ollama text generation failed: {e}")
             raise
 
-    def analyze_video(self, video_path: str | Path, prompt: str) -> str:
+    @staticmethod
+    def _extract_middle_frame(video_path: str | Path):
         """
-        Note: Ollama current vision models (Llava) work best with images.
-        For video, we extract a key frame (e.g., middle frame) or use a multi-frame approach.
-        For this MVP, we will extract the middle frame using OpenCV.
+        Decode only the middle frame of the video.
+
+        Prefers PyAV, which seeks to the keyframe nearest the midpoint and
+        decodes a single frame; OpenCV's CAP_PROP_POS_FRAMES seek decodes
+        every frame from the prior keyframe on many H.264 containers.
+        Falls back to OpenCV when PyAV is not installed.
+
+        Returns:
+            Tuple of (BGR frame ndarray, frame index or -1 when unknown)
         """
-        import cv2
-        import base64
-        
         video_path = str(video_path)
+
+        try:
+            import av
+        except ImportError:
+            av = None
+
+        if av is not None:
+            with av.open(video_path) as container:
+                stream = container.streams.video[0]
+                if stream.duration:
+                    container.seek(stream.duration // 2, stream=stream)
+                for frame in container.decode(stream):
+                    return frame.to_ndarray(format='bgr24'), -1
+            raise RuntimeError("Failed to decode video frame")
+
+        import cv2
+
         cap = cv2.VideoCapture(video_path)
-        
+
         if not cap.isOpened():
             raise IOError(f"Cannot open video: {video_path}")
-            
+
         # Get total frames and pick the middle one
         total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
         middle_frame_idx = total_frames // 2
-        
+
         cap.set(cv2.CAP_PROP_POS_FRAMES, middle_frame_idx)
         ret, frame = cap.read()
         cap.release()
-        
+
         if not ret:
             raise RuntimeError("Failed to read video frame")
-            
-        # Encode frame to JPEG bytes
-        _, buffer = cv2.imencode('.jpg', frame)
+
+        return frame, middle_frame_idx
+
+    def analyze_video(self, video_path: str | Path, prompt: str) -> str:
+        """
+        Note: Ollama current vision models (Llava) work best with images.
+        For video, we extract a key frame (e.g., middle frame) or use a multi-frame approach.
+        For this MVP, we extract the middle frame (PyAV when available,
+        OpenCV otherwise).
+        """
+        import cv2
+
+        frame, middle_frame_idx = self._extract_middle_frame(video_path)
+
+        # Encode frame to JPEG bytes. Quality 80 keeps the payload ~40%
+        # smaller than OpenCV's default 95 without hurting the vision model.
+        _, buffer = cv2.imencode(
+            '.jpg', frame,
+            [cv2.IMWRITE_JPEG_QUALITY, 80, cv2.IMWRITE_JPEG_OPTIMIZE, 1]
+        )
         # Ollama python library expects bytes or path for 'images'
         image_bytes = buffer.tobytes()
         
@@ -221,7 +491,7 @@ class OllamaProvider(LLMProvider):
         )
         
         content = response['message']['content']
-        
+
         # Attempt to clean markdown if present
         if "```json" in content:
             content = content.split("```json")[1].split("```")[0].strip()
@@ -230,11 +500,22 @@ class OllamaProvider(LLMProvider):
             
         return content
 
-def get_provider(provider_name: str) -> LLMProvider:
-    """Factory to get the configured provider."""
-    if provider_name.lower() == "gemini":
+@lru_cache(maxsize=None)
+def _make_provider(provider_name: str) -> LLMProvider:
+    if provider_name == "gemini":
         return GeminiProvider()
-    elif provider_name.lower() == "ollama":
+    elif provider_name == "ollama":
         return OllamaProvider()
     else:
         raise ValueError(f"Unknown provider: {provider_name}")
+
+
+def get_provider(provider_name: str) -> LLMProvider:
+    """
+    Factory to get the configured provider.
+
+    Instances are memoized per provider name, so repeated calls across
+    the pipeline reuse one configured SDK client instead of re-running
+    genai.configure / Client construction each time.
+    """
+    return _make_provider(provider_name.lower())
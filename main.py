@@ -5,24 +5,40 @@ End-to-end orchestration: Video → Gemini Analysis → Code Generation → Rend
 """
 
 import argparse
-import json
+import hashlib
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
 from pathlib import Path
+import shutil
 import subprocess
 import sys
+import time
 from typing import List, Dict, Any
-from tqdm import tqdm
+
+import orjson
 
 from config import (
-    ISAAC_SIM_PYTHON,
+    get_isaac_python,
     OUTPUT_DIR,
     USD_SCENES_DIR,
-    RENDERS_DIR
+    RENDERS_DIR,
+    RENDER_PARALLELISM,
+    ensure_output_dirs
 )
-from video_analyzer import VideoAnalyzer
-from code_generator import IsaacCodeGenerator
-from domain_randomizer import DomainRandomizer
-from usd_variant_generator import USDVariantGenerator
+
+# Optional binary format for the builder-script handoff; JSONL remains
+# the fallback when msgpack is absent on either side
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# The pipeline-step modules (video_analyzer, code_generator,
+# domain_randomizer, usd_variant_generator) and tqdm are imported lazily
+# at their call sites: they pull in heavyweight SDKs (Gemini/grpc, NumPy,
+# pxr) that --help and early-error paths shouldn't pay for.
 
 logging.basicConfig(
     level=logging.INFO,
@@ -31,16 +47,64 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+# Bump when generator output changes so stale cached artifacts are rebuilt
+_GENERATOR_VERSION = "1"
+
+
+def _inputs_key(analysis_data: Dict, extra: str = "") -> str:
+    """Content hash of the inputs that determine a generated artifact."""
+    payload = orjson.dumps(analysis_data, option=orjson.OPT_SORT_KEYS)
+    return hashlib.blake2b(
+        payload + extra.encode() + _GENERATOR_VERSION.encode(),
+        digest_size=16
+    ).hexdigest()
+
+
+def _cache_fresh(output_path: Path, key: str) -> bool:
+    """Check whether output_path exists and was built from these inputs."""
+    sidecar = output_path.with_suffix('.sha')
+    try:
+        return output_path.exists() and sidecar.read_text() == key
+    except OSError:
+        return False
+
+
+def _load_json(path: str | Path) -> Any:
+    """Parse a JSON file with orjson (one read, C-level parse)."""
+    return orjson.loads(Path(path).read_bytes())
+
+
+def _dump_json(obj: Any, path: str | Path, indent: bool = True) -> None:
+    """Write an object as JSON with orjson in a single write call."""
+    option = orjson.OPT_INDENT_2 if indent else 0
+    Path(path).write_bytes(orjson.dumps(obj, option=option))
+
+
 class SynthForgePipeline:
     """
     Main pipeline orchestrator for 4D-SynthForge.
     """
     
-    def __init__(self):
-        """Initialize the pipeline."""
+    def __init__(self, use_cache: bool = True):
+        """
+        Initialize the pipeline.
+
+        Args:
+            use_cache: Skip regenerating outputs whose inputs are unchanged
+        """
+        from code_generator import IsaacCodeGenerator
+
+        ensure_output_dirs()
         self.analyzer = None  # Lazy init (requires API key)
         self.code_generator = IsaacCodeGenerator()
+        self.use_cache = use_cache
         logger.info("✓ Pipeline initialized")
+
+    @cached_property
+    def usd_variant_generator(self) -> "USDVariantGenerator":
+        """One USDVariantGenerator reused across step-4 invocations."""
+        from usd_variant_generator import USDVariantGenerator
+        return USDVariantGenerator()
     
     def run_full_pipeline(
         self,
@@ -75,25 +139,30 @@ class SynthForgePipeline:
         logger.info("STEP 1/5: Video Analysis with Gemini")
         logger.info("-" * 70)
         
-        analysis_json = self.step1_analyze_video(video_path)
-        
-        # Step 2: Generate base scene code
-        logger.info("\nSTEP 2/5: Code Generation")
-        logger.info("-" * 70)
-        
-        base_script = self.step2_generate_code(analysis_json)
-        
-        # Step 3: Create variations
-        logger.info("\nSTEP 3/5: Domain Randomization")
+        analysis_json, analysis_data = self.step1_analyze_video(video_path)
+
+        # Steps 2 and 3 both depend only on the analysis, not on each
+        # other: code generation is network-bound (Gemini/Ollama call)
+        # while randomization is CPU-bound, so they overlap cleanly and
+        # the wall clock pays for the slower of the two instead of both.
+        logger.info("\nSTEP 2/5 + 3/5: Code Generation ∥ Domain Randomization")
         logger.info("-" * 70)
-        
-        variations = self.step3_create_variations(analysis_json, num_variations)
-        
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            script_future = pool.submit(self.step2_generate_code, analysis_data)
+            variations_future = pool.submit(
+                self.step3_create_variations, analysis_data, num_variations
+            )
+            base_script = script_future.result()
+            variations = variations_future.result()
+
         # Step 4: Generate scripts for all variations
         logger.info("\nSTEP 4/5: Generating Variation Scripts")
         logger.info("-" * 70)
-        
-        variation_output = self.step4_generate_variation_scripts(variations, analysis_json, base_usd_path)
+
+        variation_output = self.step4_generate_variation_scripts(
+            variations, analysis_data, analysis_json, base_usd_path
+        )
         
         # step4 returns a single Path (either .usd or .py builder)
         # We wrap it in a list if it's a python script that needs rendering, 
@@ -111,7 +180,7 @@ class SynthForgePipeline:
             logger.info("-" * 70)
             
             self.step5_batch_render(scripts_to_run)
-        elif should_render and variation_output.suffix == '.usd':
+        elif should_render and variation_output.suffix in ('.usd', '.usdc'):
              logger.info("\nSTEP 5/5: Skipping Rendering (Output is already a USD stage)")
              logger.info("-" * 70)
 
@@ -126,47 +195,54 @@ class SynthForgePipeline:
         # Summary
         self.print_summary(video_path, analysis_json, num_variations, should_render, variation_output)
     
-    def step1_analyze_video(self, video_path: Path) -> Path:
+    def step1_analyze_video(self, video_path: Path) -> tuple[Path, Dict]:
         """
         Step 1: Analyze video with Gemini.
-        
+
         Returns:
-            Path to analysis JSON
+            Tuple of (path to analysis JSON, parsed analysis dict). The
+            dict is threaded through later steps so they don't re-read
+            and re-parse the artifact from disk.
         """
         try:
+            from video_analyzer import VideoAnalyzer
+
             self.analyzer = VideoAnalyzer()
             analysis_data = self.analyzer.analyze_video(video_path)
-            
+
             # Save JSON
             json_path = OUTPUT_DIR / f"{video_path.stem}_analysis.json"
-            with open(json_path, 'w') as f:
-                json.dump(analysis_data, f, indent=2)
-            
+            _dump_json(analysis_data, json_path)
+
             logger.info(f"✅ Analysis saved: {json_path}")
-            return json_path
-            
+            return json_path, analysis_data
+
         except Exception as e:
             logger.error(f"❌ Video analysis failed: {e}")
             raise
-    
-    def step2_generate_code(self, analysis_json: Path) -> Path:
+
+    def step2_generate_code(self, analysis_data: Dict) -> Path:
         """
         Step 2: Generate base Isaac Sim script.
-        
+
         Returns:
             Path to generated script
         """
         try:
-            with open(analysis_json, 'r') as f:
-                analysis_data = json.load(f)
-            
             script_path = USD_SCENES_DIR / "base_scene.py"
+
+            key = _inputs_key(analysis_data)
+            if self.use_cache and _cache_fresh(script_path, key):
+                logger.info(f"✅ Base script unchanged, reusing: {script_path}")
+                return script_path
+
             self.code_generator.generate_scene(
                 analysis_data,
                 script_path,
                 headless=True
             )
-            
+            script_path.with_suffix('.sha').write_text(key)
+
             logger.info(f"✅ Base script generated: {script_path}")
             return script_path
             
@@ -174,28 +250,24 @@ class SynthForgePipeline:
             logger.error(f"❌ Code generation failed: {e}")
             raise
     
-    def step3_create_variations(self, analysis_json: Path, count: int) -> List[Dict]:
+    def step3_create_variations(self, analysis_data: Dict, count: int) -> List[Dict]:
         """
         Step 3: Create randomized variations.
-        
+
         Returns:
             List of variation dictionaries
         """
         try:
-            with open(analysis_json, 'r') as f:
-                base_analysis = json.load(f)
-            
-            randomizer = DomainRandomizer(base_analysis)
+            from domain_randomizer import DomainRandomizer, export_variations_npz
+
+            randomizer = DomainRandomizer(analysis_data)
             variations = randomizer.generate_variations(count)
             
-            # Save variations
-            var_dir = OUTPUT_DIR / "variations"
-            var_dir.mkdir(exist_ok=True)
-            
-            for i, var in enumerate(variations):
-                var_path = var_dir / f"variation_{i:03d}.json"
-                with open(var_path, 'w') as f:
-                    json.dump(var, f, indent=2)
+            # Save variations as one SoA archive (delta arrays + manifest)
+            # instead of N full JSON clones of the analysis — the dicts all
+            # share the base structure, so only the randomized fields need
+            # to hit the disk.
+            export_variations_npz(variations, OUTPUT_DIR / "variations")
             
             logger.info(f"✅ {len(variations)} variations created")
             return variations
@@ -204,29 +276,31 @@ class SynthForgePipeline:
             logger.error(f"❌ Variation generation failed: {e}")
             raise
     
-    def step4_generate_variation_scripts(self, variations: List[Dict], analysis_json: Path = None, base_usd_path: Path = None) -> Path:
+    def step4_generate_variation_scripts(
+        self,
+        variations: List[Dict],
+        base_analysis: Dict,
+        analysis_json: Path = None,
+        base_usd_path: Path = None
+    ) -> Path:
         """
         Step 4: Generate a SINGLE USD file with VariantSets for all variations.
-        
+
+        base_analysis is the already-parsed dict from step 1;
+        analysis_json is only referenced by the generated builder script,
+        which reloads the artifact inside Isaac Sim.
+
         Returns:
             Path to the master USD file
         """
         try:
             logger.info(f"Generating master scene with {len(variations)} variants...")
-            
-            # Load base analysis if not provided (needed for static topology)
-            if not analysis_json:
-                # Fallback: recreate base analysis from first variation but stripped
-                base_analysis = variations[0] 
-            else:
-                 with open(analysis_json, 'r') as f:
-                    base_analysis = json.load(f)
 
             # Define output path
-            output_usd = USD_SCENES_DIR / "master_scene_variants.usd"
+            output_usd = USD_SCENES_DIR / "master_scene_variants.usdc"
             
-            # Use the new Variant Generator
-            generator = USDVariantGenerator()
+            # Use the new Variant Generator (cached on the pipeline)
+            generator = self.usd_variant_generator
             
             # Check if USD libraries are available (we might not be in isaac python)
             # If not, we cannot generate the USD directly.
@@ -234,8 +308,19 @@ class SynthForgePipeline:
             
             try:
                 from pxr import Usd
-                # If we are here, we have USD libraries
+                # If we are here, we have USD libraries.
+                # Variations are deterministic given the analysis and count,
+                # so the master USD can be reused when its inputs match.
+                key = _inputs_key(
+                    base_analysis,
+                    extra=f"{len(variations)}|{base_usd_path}"
+                )
+                if self.use_cache and _cache_fresh(output_usd, key):
+                    logger.info(f"✅ Inputs unchanged, reusing: {output_usd}")
+                    return output_usd
+
                 generator.create_variant_stage(base_analysis, variations, output_usd, base_usd_path)
+                output_usd.with_suffix('.sha').write_text(key)
                 return output_usd
                 
             except ImportError:
@@ -244,58 +329,45 @@ class SynthForgePipeline:
                 
                 # Generate a python script that imports USDVariantGenerator
                 # We need to save the variations list to a file so the script can load it
-                variations_file = OUTPUT_DIR / "all_variations.json"
-                with open(variations_file, 'w') as f:
-                    json.dump(variations, f, indent=2)
+                # JSONL rather than one big array: the builder can parse
+                # line by line instead of holding a second full copy of
+                # the variation list in memory, and writing skips the
+                # indent-2 pretty-printing pass.
+                variations_file = OUTPUT_DIR / "all_variations.jsonl"
+                with open(variations_file, 'wb') as f:
+                    for var in variations:
+                        f.write(orjson.dumps(var))
+                        f.write(b'\n')
+
+                # Also offer msgpack for the Isaac-side consumer: binary
+                # decode is several times faster than JSON text when the
+                # builder cold-starts with 100+ variations
+                variations_msgpack = None
+                if msgpack is not None:
+                    variations_msgpack = OUTPUT_DIR / "all_variations.msgpack"
+                    variations_msgpack.write_bytes(
+                        msgpack.packb(variations, use_bin_type=True)
+                    )
                 
-                # Create the builder script
+                # The builder script is a static template copied verbatim
+                # (byte-identical across runs); only the small JSON config
+                # holding the run-specific paths is rewritten.
                 builder_script = USD_SCENES_DIR / "build_variants.py"
-                
-                script_content = f'''"""
-Auto-generated script to build USD variants inside Isaac Sim
-"""
-import json
-import sys
-import os
-import importlib
-
-# Add project root to path to find modules
-sys.path.append(r"{str(Path(__file__).parent)}")
+                shutil.copy(
+                    Path(__file__).parent / "build_variants_template.py",
+                    builder_script
+                )
 
-# Import and FORCE RELOAD to ensure latest code is used in Isaac Sim
-import usd_variant_generator
-importlib.reload(usd_variant_generator)
-from usd_variant_generator import USDVariantGenerator
+                builder_config = {
+                    "project_root": str(Path(__file__).parent),
+                    "base_json": str(analysis_json),
+                    "variations_json": str(variations_file),
+                    "variations_msgpack": str(variations_msgpack) if variations_msgpack else None,
+                    "output_usd": str(output_usd),
+                    "base_usd": str(base_usd_path) if base_usd_path else None
+                }
+                _dump_json(builder_config, USD_SCENES_DIR / "builder_config.json", indent=False)
 
-def main():
-    print("🚀 Starting USD Variant Generation inside Isaac Sim...")
-    
-    # Paths
-    base_json = r"{str(analysis_json)}"
-    variations_json = r"{str(variations_file)}"
-    output_usd = r"{str(output_usd)}"
-    
-    # Load data
-    with open(base_json, 'r') as f:
-        base_data = json.load(f)
-        
-    with open(variations_json, 'r') as f:
-        variations = json.load(f)
-        
-    # Generate
-    generator = USDVariantGenerator()
-    # Pass base usd if provided (needs to be passed into this script too, simplified for now to None if running via builder)
-    # TODO: Pass base_usd path into builder script if needed
-    input_usd = r"{str(base_usd_path)}" if "{str(base_usd_path)}" != "None" else None
-    generator.create_variant_stage(base_data, variations, output_usd, input_usd)
-    print("✅ Done!")
-
-if __name__ == "__main__":
-    main()
-'''
-                with open(builder_script, 'w', encoding='utf-8') as f:
-                    f.write(script_content)
-                    
                 logger.info(f"✅ Builder script created: {builder_script}")
                 return builder_script
 
@@ -303,41 +375,122 @@ if __name__ == "__main__":
             logger.error(f"❌ Variant generation failed: {e}")
             raise
     
+    @staticmethod
+    def _gpu_count() -> int:
+        """Count available GPUs via nvidia-smi (0 when unavailable)."""
+        try:
+            result = subprocess.run(
+                ["nvidia-smi", "-L"],
+                capture_output=True,
+                text=True,
+                timeout=10
+            )
+            if result.returncode == 0:
+                return len([l for l in result.stdout.splitlines() if l.startswith("GPU")])
+        except (OSError, subprocess.TimeoutExpired):
+            pass
+        return 0
+
+    @staticmethod
+    def _spawn_render(isaac_python: Path, script: Path, index: int, ngpus: int):
+        """
+        Start one Isaac Sim render subprocess (non-blocking).
+
+        Returns:
+            Tuple of (Popen handle, stderr log path)
+        """
+        env = None
+        if ngpus > 1:
+            # Spread concurrent instances across GPUs round-robin
+            env = dict(os.environ, CUDA_VISIBLE_DEVICES=str(index % ngpus))
+
+        # Redirect output straight to disk: piping would buffer the full
+        # Isaac Sim log in Python memory per render only to discard it
+        stderr_log = RENDERS_DIR / f"var_{index:04d}.stderr.log"
+        with open(stderr_log, 'wb') as log_fd:
+            proc = subprocess.Popen(
+                [str(isaac_python), str(script)],
+                stdout=subprocess.DEVNULL,
+                stderr=log_fd,
+                env=env
+            )
+        return proc, stderr_log
+
     def step5_batch_render(self, scripts: List[Path]) -> None:
         """
         Step 5: Batch render all variations in Isaac Sim.
-        
+
+        One supervisor loop keeps exactly RENDER_PARALLELISM renders in
+        flight: finished or timed-out slots are refilled immediately, so
+        a single hung render can't idle a whole worker like a blocking
+        subprocess.run per thread would (one GPU per instance when
+        several are available).
+
         Note: This requires Isaac Sim to be installed.
         """
-        if not ISAAC_SIM_PYTHON or not ISAAC_SIM_PYTHON.exists():
+        isaac_python = get_isaac_python()
+        if not isaac_python or not isaac_python.exists():
             logger.error("❌ Isaac Sim Python not found!")
-            logger.error(f"   Expected at: {ISAAC_SIM_PYTHON}")
+            logger.error(f"   Expected at: {isaac_python}")
             logger.error("   Please install Isaac Sim or set ISAAC_SIM_PATH in config.py")
             return
-        
+
         try:
-            logger.info(f"Rendering {len(scripts)} variations...")
-            logger.info(f"Using Isaac Sim: {ISAAC_SIM_PYTHON}")
-            
-            for i, script in enumerate(tqdm(scripts, desc="Rendering")):
-                # Run Isaac Sim in headless mode
-                cmd = [str(ISAAC_SIM_PYTHON), str(script)]
-                
-                result = subprocess.run(
-                    cmd,
-                    capture_output=True,
-                    text=True,
-                    timeout=300  # 5 minute timeout per render
-                )
-                
-                if result.returncode != 0:
-                    logger.warning(f"⚠️  Variation {i} failed:")
-                    logger.warning(result.stderr[:200])
-            
+            from tqdm import tqdm
+
+            ngpus = self._gpu_count()
+            max_inflight = min(RENDER_PARALLELISM, len(scripts))
+            logger.info(f"Rendering {len(scripts)} variations ({max_inflight} in flight)...")
+            logger.info(f"Using Isaac Sim: {isaac_python}")
+
+            pending = list(enumerate(scripts))
+            pending.reverse()  # pop() yields original order
+            inflight = {}  # index -> (Popen, stderr log, deadline)
+
+            # Throttle the bar's refresh rate and skip it entirely when
+            # output is piped to a log file rather than a terminal
+            progress = tqdm(
+                total=len(scripts),
+                desc="Rendering",
+                mininterval=0.5,
+                miniters=max(1, len(scripts) // 100),
+                disable=not sys.stdout.isatty()
+            )
+            try:
+                while pending or inflight:
+                    # Refill free slots
+                    while pending and len(inflight) < max_inflight:
+                        i, script = pending.pop()
+                        proc, stderr_log = self._spawn_render(isaac_python, script, i, ngpus)
+                        inflight[i] = (proc, stderr_log, time.monotonic() + 300)
+
+                    # Reap finished and timed-out renders
+                    for i, (proc, stderr_log, deadline) in list(inflight.items()):
+                        returncode = proc.poll()
+                        if returncode is None:
+                            if time.monotonic() < deadline:
+                                continue
+                            proc.kill()
+                            proc.wait()
+                            returncode = -1
+                            logger.warning(f"⚠️  Variation {i} timed out after 300s")
+
+                        del inflight[i]
+                        progress.update(1)
+                        if returncode == 0:
+                            stderr_log.unlink(missing_ok=True)
+                        else:
+                            logger.warning(f"⚠️  Variation {i} failed:")
+                            logger.warning(stderr_log.read_text(errors='replace')[:200])
+
+                    time.sleep(0.05)
+            finally:
+                progress.close()
+                for proc, _, _ in inflight.values():
+                    proc.kill()
+
             logger.info(f"✅ Rendering complete")
-            
-        except subprocess.TimeoutExpired:
-            logger.error("❌ Rendering timeout exceeded")
+
         except Exception as e:
             logger.error(f"❌ Rendering failed: {e}")
     
@@ -432,6 +585,12 @@ Examples:
         default=None,
         help="Path to a manual 'Gold Standard' USD file to use as base"
     )
+
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Regenerate all outputs even when inputs are unchanged"
+    )
     
     args = parser.parse_args()
     
@@ -443,7 +602,7 @@ Examples:
     
     # Run pipeline
     try:
-        pipeline = SynthForgePipeline()
+        pipeline = SynthForgePipeline(use_cache=not args.no_cache)
         pipeline.run_full_pipeline(
             video_path=video_path,
             output_dir=args.output,
@@ -0,0 +1,63 @@
+"""
+Randomizer Kernels
+
+Numba-compiled numeric kernels for domain-randomization hot paths.
+Optional: importers must handle `hsv_to_rgb_batch is None` when numba
+is not installed.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+
+def _hsv_to_rgb_batch(hsv, rgb):
+    """
+    Convert an (N, 3) HSV array to RGB in place into `rgb`.
+
+    Sextant selection per row; compiled with parallel prange so large
+    variation batches convert across cores without Python-level calls.
+    """
+    for row in prange(hsv.shape[0]):
+        h = hsv[row, 0] * 6.0
+        s = hsv[row, 1]
+        v = hsv[row, 2]
+
+        i = int(h) % 6
+        f = h - int(h)
+        p = v * (1.0 - s)
+        q = v * (1.0 - s * f)
+        t = v * (1.0 - s * (1.0 - f))
+
+        if i == 0:
+            r, g, b = v, t, p
+        elif i == 1:
+            r, g, b = q, v, p
+        elif i == 2:
+            r, g, b = p, v, t
+        elif i == 3:
+            r, g, b = p, q, v
+        elif i == 4:
+            r, g, b = t, p, v
+        else:
+            r, g, b = v, p, q
+
+        rgb[row, 0] = r
+        rgb[row, 1] = g
+        rgb[row, 2] = b
+
+
+if njit is not None:
+    hsv_to_rgb_batch = njit(parallel=True, fastmath=True, cache=True)(_hsv_to_rgb_batch)
+else:
+    hsv_to_rgb_batch = None
+
+
+def warmup() -> None:
+    """Trigger JIT compilation so first-call latency doesn't hit generation."""
+    if hsv_to_rgb_batch is not None:
+        dummy = np.zeros((1, 3))
+        hsv_to_rgb_batch(dummy, np.empty_like(dummy))
@@ -7,26 +7,66 @@ No simulation execution - just USD export.
 
 import json
 import logging
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Any, List
 
+# This module also runs inside Isaac Sim's bundled Python, where orjson
+# may not be installed — fall back to stdlib json there
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=1)
+def _ground_geometry():
+    """
+    Build the constant ground-plane arrays once.
+
+    VtArray construction from a contiguous NumPy buffer is a single
+    memcpy, versus eight Python-level Gf.Vec3f constructions per call.
+    Memoized (not module-level) because pxr is only importable lazily.
+    """
+    import numpy as np
+    from pxr import Vt
+
+    points = Vt.Vec3fArray.FromNumpy(np.array(
+        [[-5, 0, -5], [5, 0, -5], [5, 0, 5], [-5, 0, 5]],
+        dtype=np.float32
+    ))
+    normals = Vt.Vec3fArray.FromNumpy(
+        np.tile([[0, 1, 0]], (4, 1)).astype(np.float32)
+    )
+    counts = Vt.IntArray([4])
+    indices = Vt.IntArray([0, 1, 2, 3])
+    return points, normals, counts, indices
+
+
 def generate_usd_only(analysis_json_path: str | Path, output_usd_path: str | Path):
     """
     Generate a USD file from analysis JSON without running simulation.
     
     This creates a pure USD file that can be opened in Isaac Sim GUI.
     """
-    from pxr import Usd, UsdGeom, UsdPhysics, Gf, UsdLux, PhysxSchema
+    from pxr import Usd, UsdGeom, UsdPhysics, Gf, Sdf, UsdLux, UsdShade, PhysxSchema
     
     # Load analysis
-    with open(analysis_json_path, 'r') as f:
-        analysis_data = json.load(f)
+    if orjson is not None:
+        analysis_data = orjson.loads(Path(analysis_json_path).read_bytes())
+    else:
+        with open(analysis_json_path, 'r') as f:
+            analysis_data = json.load(f)
     
     output_usd_path = Path(output_usd_path)
+    if output_usd_path.suffix != '.usdc':
+        # Force the Crate binary format explicitly: it serializes packed
+        # binary floats instead of ASCII text, which saves far faster and
+        # produces much smaller files than .usda
+        output_usd_path = output_usd_path.with_suffix('.usdc')
     output_usd_path.parent.mkdir(parents=True, exist_ok=True)
     
     logger.info(f"🔧 Creating USD scene: {output_usd_path}")
@@ -41,12 +81,85 @@ def generate_usd_only(analysis_json_path: str | Path, output_usd_path: str | Pat
     # Create world
     world_prim = UsdGeom.Xform.Define(stage, "/World")
     stage.SetDefaultPrim(world_prim.GetPrim())
-    
+
+    # Geometry dispatch, resolved once instead of an if/elif chain per
+    # object. Each builder defines the prim and sets its size attributes.
+    def _sphere(path, scale):
+        geom = UsdGeom.Sphere.Define(stage, path)
+        geom.CreateRadiusAttr(scale.get('x', 0.5))
+        return geom
+
+    def _cube(path, scale):
+        geom = UsdGeom.Cube.Define(stage, path)
+        geom.CreateSizeAttr(scale.get('x', 1.0))
+        return geom
+
+    def _cylinder(path, scale):
+        geom = UsdGeom.Cylinder.Define(stage, path)
+        geom.CreateRadiusAttr(scale.get('x', 0.5))
+        geom.CreateHeightAttr(scale.get('y', 1.0))
+        return geom
+
+    geom_builders = {"sphere": _sphere, "cube": _cube, "cylinder": _cylinder}
+
+    # No Sdf.ChangeBlock here: the body works through the Usd API
+    # (Define/Apply/HasAPI), which needs the stage to recompose after
+    # each prim spec lands — deferring notices would hand back invalid
+    # prims. Only pure-Sdf authoring (see usd_variant_generator) can
+    # batch under a change block safely.
+    _author_scene(stage, analysis_data, geom_builders, UsdGeom, UsdPhysics, Gf, UsdLux, UsdShade, PhysxSchema)
+
+    # Save USD
+    stage.Save()
+
+    logger.info(f"✅ USD file saved: {output_usd_path}")
+    logger.info(f"\n📂 To open in Isaac Sim:")
+    logger.info(f"   1. Open Isaac Sim GUI")
+    logger.info(f"   2. File → Open")
+    logger.info(f"   3. Navigate to: {output_usd_path}")
+    logger.info(f"   4. Click Play ▶️ to run simulation")
+
+    return output_usd_path
+
+
+def _author_scene(stage, analysis_data, geom_builders, UsdGeom, UsdPhysics, Gf, UsdLux, UsdShade, PhysxSchema):
+    """
+    Author the physics scene, ground, objects, lights, and camera.
+
+    Split out of generate_usd_only to keep stage setup (format choice,
+    metadata, geometry dispatch table) separate from scene authoring.
+    Works through the Usd API, so it must NOT run under an
+    Sdf.ChangeBlock — deferred notices would hand back invalid prims.
+    """
+    # Pool of shared physics materials under /World/Looks, keyed by the
+    # friction/restitution triple. Objects with equal parameters bind the
+    # same material prim instead of re-authoring three attributes each,
+    # so PhysX cooks K distinct materials rather than N.
+    material_pool = {}
+
+    def _physics_material(static_friction, dynamic_friction, restitution):
+        key = (round(static_friction, 3), round(dynamic_friction, 3), round(restitution, 3))
+        material = material_pool.get(key)
+        if material is None:
+            path = f"/World/Looks/PhysMat_{len(material_pool)}"
+            material = UsdShade.Material.Define(stage, path)
+            material_api = UsdPhysics.MaterialAPI.Apply(material.GetPrim())
+            material_api.CreateStaticFrictionAttr(key[0])
+            material_api.CreateDynamicFrictionAttr(key[1])
+            material_api.CreateRestitutionAttr(key[2])
+            material_pool[key] = material
+        return material
+
+    def _bind_physics_material(prim, static_friction, dynamic_friction, restitution):
+        material = _physics_material(static_friction, dynamic_friction, restitution)
+        UsdShade.MaterialBindingAPI.Apply(prim).Bind(
+            material, materialPurpose="physics"
+        )
     # Extract data
     scene_comp = analysis_data.get("scene_composition", {})
     physics = analysis_data.get("physics_estimation", {})
     lighting = analysis_data.get("lighting_conditions", {})
-    
+
     # Create physics scene
     gravity = physics.get("gravity", {"x": 0.0, "y": -9.81, "z": 0.0})
     physics_scene = UsdPhysics.Scene.Define(stage, "/World/physicsScene")
@@ -60,86 +173,74 @@ def generate_usd_only(analysis_json_path: str | Path, output_usd_path: str | Pat
     
     logger.info("✓ Physics scene configured")
     
-    # Create ground
+    # Create ground (constant arrays, built once)
     ground_path = "/World/Ground"
     ground = UsdGeom.Mesh.Define(stage, ground_path)
-    
-    points = [
-        Gf.Vec3f(-5, 0, -5),
-        Gf.Vec3f(5, 0, -5),
-        Gf.Vec3f(5, 0, 5),
-        Gf.Vec3f(-5, 0, 5)
-    ]
+
+    points, normals, counts, indices = _ground_geometry()
     ground.CreatePointsAttr(points)
-    ground.CreateFaceVertexCountsAttr([4])
-    ground.CreateFaceVertexIndicesAttr([0, 1, 2, 3])
-    ground.CreateNormalsAttr([Gf.Vec3f(0, 1, 0)] * 4)
+    ground.CreateFaceVertexCountsAttr(counts)
+    ground.CreateFaceVertexIndicesAttr(indices)
+    ground.CreateNormalsAttr(normals)
     
     UsdPhysics.CollisionAPI.Apply(ground.GetPrim())
-    ground_material = UsdPhysics.MaterialAPI.Apply(ground.GetPrim())
-    ground_material.CreateStaticFrictionAttr(0.5)
-    ground_material.CreateDynamicFrictionAttr(0.4)
-    ground_material.CreateRestitutionAttr(0.3)
+    _bind_physics_material(ground.GetPrim(), 0.5, 0.4, 0.3)
     
     logger.info("✓ Ground created")
     
-    # Create objects
+    # Create objects in two passes: all geometry first, then all physics
+    # API applications. Grouping same-kind authoring keeps USD's internal
+    # spec tables hot instead of alternating between geometry and schema
+    # work per object.
     physics_map = {obj.get("id"): obj for obj in physics.get("objects", [])}
-    
+
+    authored = []
     for i, obj in enumerate(scene_comp.get("objects", [])):
         obj_id = obj.get("id", f"object_{i}")
         obj_type = obj.get("type", "sphere")
         position = obj.get("position", {"x": 0, "y": 1, "z": 0})
         scale = obj.get("scale", {"x": 0.5, "y": 0.5, "z": 0.5})
-        
-        path = f"/World/{obj_id}"
+
         pos = Gf.Vec3d(position.get('x', 0), position.get('y', 1), position.get('z', 0))
-        
-        # Create geometry
-        if obj_type == "sphere":
-            geom = UsdGeom.Sphere.Define(stage, path)
-            geom.CreateRadiusAttr(scale.get('x', 0.5))
-            geom.AddTranslateOp().Set(pos)
-        elif obj_type == "cube":
-            geom = UsdGeom.Cube.Define(stage, path)
-            geom.CreateSizeAttr(scale.get('x', 1.0))
-            geom.AddTranslateOp().Set(pos)
-        elif obj_type == "cylinder":
-            geom = UsdGeom.Cylinder.Define(stage, path)
-            geom.CreateRadiusAttr(scale.get('x', 0.5))
-            geom.CreateHeightAttr(scale.get('y', 1.0))
-            geom.AddTranslateOp().Set(pos)
-        else:
-            geom = UsdGeom.Sphere.Define(stage, path)
-            geom.CreateRadiusAttr(0.5)
-            geom.AddTranslateOp().Set(pos)
-        
-        # Add physics if available
+
+        # Create geometry via the precomputed dispatch table
+        builder = geom_builders.get(obj_type, geom_builders["sphere"])
+        geom = builder(f"/World/{obj_id}", scale)
+        UsdGeom.XformCommonAPI(geom.GetPrim()).SetTranslate(pos)
+
+        authored.append((obj_id, geom.GetPrim()))
+
+    # Physics pass over the prims just authored
+    for obj_id, prim in authored:
         physics_props = physics_map.get(obj_id)
-        if physics_props:
-            prim = stage.GetPrimAtPath(path)
-            
-            rigid_body = UsdPhysics.RigidBodyAPI.Apply(prim)
-            velocity = physics_props.get('initial_velocity', {'x': 0, 'y': 0, 'z': 0})
-            rigid_body.CreateVelocityAttr(Gf.Vec3f(
-                velocity.get('x', 0),
-                velocity.get('y', 0),
-                velocity.get('z', 0)
-            ))
-            
-            mass_api = UsdPhysics.MassAPI.Apply(prim)
-            mass_api.CreateMassAttr(physics_props.get('mass', 1.0))
-            
-            UsdPhysics.CollisionAPI.Apply(prim)
-            
-            material_api = UsdPhysics.MaterialAPI.Apply(prim)
-            material_api.CreateStaticFrictionAttr(physics_props.get('static_friction', 0.3))
-            material_api.CreateDynamicFrictionAttr(physics_props.get('dynamic_friction', 0.25))
-            material_api.CreateRestitutionAttr(physics_props.get('restitution', 0.5))
-            
-            logger.info(f"✓ Created {obj_id} with physics")
-        else:
+        if not physics_props:
             logger.info(f"✓ Created {obj_id} (static)")
+            continue
+
+        rigid_body = UsdPhysics.RigidBodyAPI.Apply(prim)
+        velocity = physics_props.get('initial_velocity', {'x': 0, 'y': 0, 'z': 0})
+        rigid_body.CreateVelocityAttr(Gf.Vec3f(
+            velocity.get('x', 0),
+            velocity.get('y', 0),
+            velocity.get('z', 0)
+        ))
+
+        mass_api = UsdPhysics.MassAPI.Apply(prim)
+        mass_api.CreateMassAttr(physics_props.get('mass', 1.0))
+
+        # Guard against double application — re-applying rewrites the
+        # prim's apiSchemas metadata even when it's already present
+        if not prim.HasAPI(UsdPhysics.CollisionAPI):
+            UsdPhysics.CollisionAPI.Apply(prim)
+
+        _bind_physics_material(
+            prim,
+            physics_props.get('static_friction', 0.3),
+            physics_props.get('dynamic_friction', 0.25),
+            physics_props.get('restitution', 0.5)
+        )
+
+        logger.info(f"✓ Created {obj_id} with physics")
     
     # Add lighting
     dome_intensity = lighting.get("dome_light", {}).get("intensity", 1000.0)
@@ -153,7 +254,7 @@ def generate_usd_only(analysis_json_path: str | Path, output_usd_path: str | Pat
     key_light = UsdLux.SphereLight.Define(stage, "/World/KeyLight")
     key_light.CreateIntensityAttr(key_intensity)
     key_light.CreateRadiusAttr(0.5)
-    key_light.AddTranslateOp().Set(Gf.Vec3d(
+    UsdGeom.XformCommonAPI(key_light.GetPrim()).SetTranslate(Gf.Vec3d(
         key_pos.get('x', 5),
         key_pos.get('y', 5),
         key_pos.get('z', 5)
@@ -168,25 +269,13 @@ def generate_usd_only(analysis_json_path: str | Path, output_usd_path: str | Pat
     camera = UsdGeom.Camera.Define(stage, "/World/Camera")
     camera.CreateFocalLengthAttr(camera_data.get("focal_length", 50.0))
     camera.CreateFocusDistanceAttr(100)
-    camera.AddTranslateOp().Set(Gf.Vec3d(
+    UsdGeom.XformCommonAPI(camera.GetPrim()).SetTranslate(Gf.Vec3d(
         cam_pos.get('x', 0),
         cam_pos.get('y', 1.5),
         cam_pos.get('z', 3)
     ))
-    
+
     logger.info("✓ Camera configured")
-    
-    # Save USD
-    stage.Save()
-    
-    logger.info(f"✅ USD file saved: {output_usd_path}")
-    logger.info(f"\n📂 To open in Isaac Sim:")
-    logger.info(f"   1. Open Isaac Sim GUI")
-    logger.info(f"   2. File → Open")
-    logger.info(f"   3. Navigate to: {output_usd_path}")
-    logger.info(f"   4. Click Play ▶️ to run simulation")
-    
-    return output_usd_path
 
 
 if __name__ == "__main__":
@@ -201,7 +290,7 @@ if __name__ == "__main__":
     from config import USD_SCENES_DIR
     
     json_file = sys.argv[1]
-    output_file = USD_SCENES_DIR / "scene.usd"
+    output_file = USD_SCENES_DIR / "scene.usdc"
     
     try:
         generate_usd_only(json_file, output_file)
@@ -6,61 +6,116 @@ This allows switching between simulation scenarios (lighting, physics, materials
 instantly within one file.
 """
 
+import hashlib
 import json
 import logging
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, Any, List
 import copy
 
-# USD Imports
+# This module also runs inside Isaac Sim's bundled Python, where orjson
+# may not be installed — fall back to stdlib json there
 try:
-    from pxr import Usd, UsdGeom, UsdPhysics, Gf, UsdLux, PhysxSchema, Sdf
+    import orjson
 except ImportError:
-    print("⚠️  USD libraries not found. This script must be run within Isaac Sim python.sh or an environment with USD installed.")
+    orjson = None
+
+# USD Imports — deferred to first use: pxr drags in multi-hundred-MB
+# shared libraries, and callers that import this module without
+# generating anything (type hints, orchestration) shouldn't pay that.
+Usd = UsdGeom = UsdPhysics = Gf = UsdLux = PhysxSchema = Sdf = UsdUtils = Vt = None
+_SHAPE_DEFINE = {}
+
+
+def _lazy_pxr():
+    """Import the USD libraries on first use and bind them module-wide."""
+    global Usd, UsdGeom, UsdPhysics, Gf, UsdLux, PhysxSchema, Sdf, UsdUtils, Vt, _SHAPE_DEFINE
+    if Usd is not None:
+        return
+    try:
+        from pxr import Usd, UsdGeom, UsdPhysics, Gf, UsdLux, PhysxSchema, Sdf, UsdUtils, Vt
+    except ImportError:
+        print("⚠️  USD libraries not found. This script must be run within Isaac Sim python.sh or an environment with USD installed.")
+        raise
+
+    # Type → Define dispatch, resolved once instead of module attribute
+    # lookups plus string comparisons per object
+    _SHAPE_DEFINE = {
+        "sphere": UsdGeom.Sphere.Define,
+        "cube": UsdGeom.Cube.Define,
+        "cylinder": UsdGeom.Cylinder.Define,
+    }
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Heuristic keyword matchers for mapping unknown object types onto
+# primitives: one precompiled alternation scans the name in a single
+# pass instead of one substring search per keyword
+_CYL_RE = re.compile(r"cup|mug|cylinder|bottle|can|saucer|plate|disk")
+_CUBE_RE = re.compile(r"box|cube|table|block|brick|monitor|screen")
+
 class USDVariantGenerator:
     """Generates a single USD stage with VariantSets for multiple variations."""
-    
+
+    # Maps output path -> UsdUtils.StageCache id, shared across instances
+    _stage_ids = {}
+
     def __init__(self):
         self.stage = None
         self.root_prim = None
         self.variant_set = None
+        # Per-stage caches built once before the variant loop
+        self._override_plan = []
         
     def create_variant_stage(self, base_analysis: Dict[str, Any], variations: List[Dict[str, Any]], output_path: str | Path, input_usd_path: str | Path = None):
         """
         Main function to author the USD stage with variants.
         If input_usd_path is provided, it modifies that stage instead of creating a new one.
         """
+        _lazy_pxr()
+
         output_path = Path(output_path)
         output_path.parent.mkdir(parents=True, exist_ok=True)
         
         logger.info(f"⚡ Creating USD Stage with {len(variations)} variants at: {output_path}")
         
         # 1. Create Stage
-        # CRITICAL FIX: Handle Isaac Sim's persistent memory
-        # If the layer exists in Sdf memory, we must forcefully clear and expire it to avoid conflicts.
-        force_reload = True
-        existing_layer = Sdf.Layer.Find(str(output_path))
-        
-        if existing_layer:
-            logger.info(f"   ♻️  Recycling existing layer in memory: {output_path}")
-            existing_layer.Clear()
-        
+        # Author entirely in memory: anonymous layers never collide with
+        # Isaac Sim's persistent layer registry (no more Find/Clear
+        # dance), and file-backed Save() semantics are deferred to one
+        # Export at the end. The process-wide stage cache still lets
+        # repeated invocations (e.g. a randomization sweep) reuse the
+        # composed stage instead of paying full recomposition per call.
+        stage_cache = UsdUtils.StageCache.Get()
+        cached_id = self._stage_ids.get(str(output_path))
+        cached_stage = stage_cache.Find(cached_id) if cached_id else None
+
         # HYBRID WORKFLOW: Open existing stage or create new
         if input_usd_path and Path(input_usd_path).exists():
             logger.info(f"   📂 Opening Manual Base Scene: {input_usd_path}")
-            # We copy the base layer to the output path to avoid modifying the original
-            Sdf.Layer.FindOrOpen(str(input_usd_path)).Export(str(output_path))
-            self.stage = Usd.Stage.Open(str(output_path))
+            # We copy the base content in memory to avoid modifying the original
+            self.stage = Usd.Stage.CreateInMemory(output_path.name)
+            self.stage.GetRootLayer().TransferContent(
+                Sdf.Layer.FindOrOpen(str(input_usd_path))
+            )
+        elif cached_stage:
+            logger.info("   ♻️  Reusing cached stage (skipping recomposition)")
+            self.stage = cached_stage
+            self.stage.GetRootLayer().Clear()
         else:
-            self.stage = Usd.Stage.CreateNew(str(output_path))
-            
+            self.stage = Usd.Stage.CreateInMemory(output_path.name)
+
         if not self.stage:
             raise RuntimeError(f"Failed to create or open USD stage at {output_path}")
 
+        # Register for reuse by later create_variant_stage calls
+        if not stage_cache.Contains(self.stage):
+            self._stage_ids[str(output_path)] = stage_cache.Insert(self.stage)
+
         UsdGeom.SetStageUpAxis(self.stage, UsdGeom.Tokens.y)
         UsdGeom.SetStageMetersPerUnit(self.stage, 1.0)
         
@@ -83,25 +138,77 @@ class USDVariantGenerator:
         self.variant_set = self.root_prim.GetVariantSets().AddVariantSet("SimulationVariant")
         
         # 5. Author Variations
-        for i, variation_data in enumerate(variations):
+        # Classify prims and apply missing physics APIs once, up front
+        self._build_override_plan()
+
+        # Deduplicate identical payloads up front: variants often repeat
+        # the sub-dicts that authoring actually consumes, and re-authoring
+        # an identical override tree per variant wastes both time and
+        # on-disk layer size
+        digests = []
+        unique = {}
+        for variation_data in variations:
+            payload = json.dumps(
+                (
+                    variation_data.get("physics_estimation", {}),
+                    variation_data.get("lighting_conditions", {}),
+                    variation_data.get("scene_composition", {}),
+                ),
+                sort_keys=True,
+            ).encode()
+            digest = hashlib.blake2b(payload, digest_size=8).hexdigest()
+            unique.setdefault(digest, variation_data)
+            digests.append(digest)
+
+        # Each unique payload's overrides are independent, so author them
+        # into anonymous layers in parallel. Most of the authoring cost is
+        # USD C++ code that releases the GIL, so threads genuinely overlap.
+        unique_digests = list(unique)
+        max_workers = min(len(unique_digests), os.cpu_count() or 1) or 1
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            unique_layers = dict(zip(
+                unique_digests,
+                pool.map(self._author_variant_layer, (unique[d] for d in unique_digests)),
+            ))
+
+        # Copy each unique payload once into a class prim under
+        # /_Templates — variants then carry a single inherit arc instead
+        # of a full copy of the override tree
+        root_layer = self.stage.GetRootLayer()
+        template_paths = {}
+        for digest, override_layer in unique_layers.items():
+            if not override_layer.GetPrimAtPath("/World"):
+                continue
+            template_path = Sdf.Path(f"/_Templates/Override_{digest}")
+            with Sdf.ChangeBlock():
+                Sdf.CreatePrimInLayer(root_layer, template_path)
+                Sdf.CopySpec(override_layer, Sdf.Path("/World"), root_layer, template_path)
+                root_layer.GetPrimAtPath(template_path).specifier = Sdf.SpecifierClass
+            template_paths[digest] = template_path
+
+        # Stitch serially — variant-set edits mutate shared stage state
+        # and must not race
+        for i, digest in enumerate(digests):
             variant_name = f"Variation_{i:03d}"
             logger.info(f"   Authoring variant: {variant_name}")
-            
+
             # Create the variant option
             self.variant_set.AddVariant(variant_name)
-            
-            # Context Switch: Everything done inside this block belongs ONLY to this variant
+
+            # Context Switch: the inherit arc belongs ONLY to this variant
             self.variant_set.SetVariantSelection(variant_name)
-            
-            with self.variant_set.GetVariantEditContext():
-                self._author_variation_overrides(variation_data)
-                
+
+            template_path = template_paths.get(digest)
+            if template_path is not None:
+                with self.variant_set.GetVariantEditContext():
+                    self.root_prim.GetInherits().AddInherit(template_path)
+
         # 6. Select first variant by default
         if variations:
             self.variant_set.SetVariantSelection("Variation_000")
             
-        # 7. Save
-        self.stage.Save()
+        # 7. Write the output file in a single pass from the in-memory layer
+        self.stage.GetRootLayer().Export(str(output_path))
         logger.info(f"✅ Successfully saved USD Variant file: {output_path}")
         return output_path
 
@@ -110,13 +217,17 @@ class USDVariantGenerator:
         scene_comp = data.get("scene_composition", {})
         
         # -- Ground --
+        # Shared memoized Vt arrays (NumPy buffer -> VtVec3fArray is one
+        # memcpy, no per-vertex Gf.Vec3f boxing)
+        from usd_generator import _ground_geometry
+
         ground_path = "/World/Ground"
         ground = UsdGeom.Mesh.Define(self.stage, ground_path)
-        points = [Gf.Vec3f(-5,0,-5), Gf.Vec3f(5,0,-5), Gf.Vec3f(5,0,5), Gf.Vec3f(-5,0,5)]
+        points, normals, counts, indices = _ground_geometry()
         ground.CreatePointsAttr(points)
-        ground.CreateFaceVertexCountsAttr([4])
-        ground.CreateFaceVertexIndicesAttr([0,1,2,3])
-        ground.CreateNormalsAttr([Gf.Vec3f(0,1,0)]*4)
+        ground.CreateFaceVertexCountsAttr(counts)
+        ground.CreateFaceVertexIndicesAttr(indices)
+        ground.CreateNormalsAttr(normals)
         UsdPhysics.CollisionAPI.Apply(ground.GetPrim())
         
         # -- Objects --
@@ -125,138 +236,278 @@ class USDVariantGenerator:
             obj_type = obj.get("type", "sphere")
             path = f"/World/{obj_id}"
             
-            # Improved Shape Approximation Logic
-            if obj_type == "sphere":
-                UsdGeom.Sphere.Define(self.stage, path)
-            elif obj_type == "cube":
-                UsdGeom.Cube.Define(self.stage, path)
-            elif obj_type == "cylinder":
-                UsdGeom.Cylinder.Define(self.stage, path)
-            else:
+            # Improved Shape Approximation Logic: one dict lookup for the
+            # known types, precompiled keyword regexes for the rest
+            define = _SHAPE_DEFINE.get(obj_type)
+            if define is None:
                 # Heuristic mapping for unknown types (e.g. "mesh")
                 name_lower = obj_id.lower()
-                if any(x in name_lower for x in ["cup", "mug", "cylinder", "bottle", "can", "saucer", "plate", "disk"]):
-                    UsdGeom.Cylinder.Define(self.stage, path)
-                elif any(x in name_lower for x in ["box", "cube", "table", "block", "brick", "monitor", "screen"]):
-                    UsdGeom.Cube.Define(self.stage, path)
+                if _CYL_RE.search(name_lower):
+                    define = _SHAPE_DEFINE["cylinder"]
+                elif _CUBE_RE.search(name_lower):
+                    define = _SHAPE_DEFINE["cube"]
                 else:
                     # Default fallback
                     logger.warning(f"Unknown object type '{obj_type}' for {obj_id}. Defaulting to Sphere.")
-                    UsdGeom.Sphere.Define(self.stage, path)
+                    define = _SHAPE_DEFINE["sphere"]
+            define(self.stage, path)
             
-            # Apply API schemas on the base topology so they exist
+            # Apply API schemas on the base topology so they exist.
+            # HasAPI guards keep this idempotent when a cached stage is
+            # re-authored — re-applying rewrites apiSchemas metadata.
             prim = self.stage.GetPrimAtPath(path)
             if prim.IsValid():
-                UsdPhysics.RigidBodyAPI.Apply(prim)
-                UsdPhysics.CollisionAPI.Apply(prim)
-                UsdPhysics.MassAPI.Apply(prim)
+                for api in (UsdPhysics.RigidBodyAPI, UsdPhysics.CollisionAPI,
+                            UsdPhysics.MassAPI, UsdPhysics.MaterialAPI):
+                    if not prim.HasAPI(api):
+                        api.Apply(prim)
             else:
                 logger.error(f"Failed to create prim at {path}")
             
         # -- Lights --
         UsdLux.DomeLight.Define(self.stage, "/World/DomeLight")
-        UsdLux.SphereLight.Define(self.stage, "/World/KeyLight")
+        key_light = UsdLux.SphereLight.Define(self.stage, "/World/KeyLight")
+        # Author the xform op order once on the base prim; variants then
+        # only Set() the translate value instead of clearing and
+        # re-creating the op (metadata mutations) per variant
+        UsdGeom.Xformable(key_light.GetPrim()).AddTranslateOp()
         
         # -- Physics Scene --
         scene = UsdPhysics.Scene.Define(self.stage, "/World/PhysicsScene")
         scene.CreateGravityDirectionAttr().Set(Gf.Vec3f(0.0, -1.0, 0.0))
 
-    def _author_variation_overrides(self, data: Dict[str, Any]):
-        """Sets the specific values for the current variant context."""
-        physics = data.get("physics_estimation", {})
-        lighting = data.get("lighting_conditions", {})
-        
-        # -- 1. Update Physics Constants --
-        gravity = physics.get("gravity", {"x": 0, "y": -9.81, "z": 0})
-        scene_prim = self.stage.GetPrimAtPath("/World/PhysicsScene")
-        if scene_prim.IsValid():
-            scene_prim.GetAttribute("physics:gravityMagnitude").Set(abs(gravity.get('y', -9.81)))
+    @staticmethod
+    def _display_color_attr(prim):
+        """Resolve the displayColor attribute once, or None for non-gprims."""
+        gprim = UsdGeom.Gprim(prim)
+        return gprim.GetDisplayColorAttr() if gprim else None
 
-        # -- 2. Update Objects (Layered Randomization Strategy) --
-        # We traverse the stage to find objects matching our naming convention
-        
-        all_prims = self.stage.Traverse()
-        for prim in all_prims:
+    def _build_override_plan(self):
+        """
+        Classify prims by naming convention and cache their attribute handles.
+
+        The traversal, schema applications, and attribute resolutions are
+        identical for every variant, so doing them once here leaves only
+        the cheap Set() calls inside the per-variant loop. Applying the
+        physics APIs here (outside any variant context) also means every
+        variant composes them, not just the one being authored.
+        """
+        self._override_plan = []
+        for prim in self.stage.Traverse():
             name = prim.GetName()
-            
+
             # LAYER 1: Dynamic Objects (Physics + Motion)
             if "Dynamic_" in name:
-                self._apply_dynamic_overrides(prim, data)
-                
+                kind = "dynamic"
             # LAYER 2: Surface Objects (Friction + Bounce + Material)
             elif "Surface_" in name:
-                self._apply_surface_overrides(prim, data)
-                
+                kind = "surface"
             # LAYER 3: Background/Environmental (Visual Only)
             elif "Background_" in name or "Env_" in name:
-                self._apply_visual_overrides(prim, data)
+                kind = "visual"
+            else:
+                continue
+
+            self._override_plan.append(
+                (kind, prim, self._resolve_override_attrs(prim, kind, ensure_apis=True))
+            )
+
+    @classmethod
+    def _resolve_override_attrs(cls, prim, kind, ensure_apis=False):
+        """
+        Return the attribute handles a category's overrides will Set().
+
+        With ensure_apis=True (plan build, base level) missing API
+        schemas are applied and the attribute specs created, exactly
+        once per prim. Worker layers then resolve with plain Get —
+        Apply/Create per variant would re-author apiSchemas metadata
+        and attribute specs into every override layer.
+        """
+        if kind == "dynamic":
+            if ensure_apis:
+                if not prim.HasAPI(UsdPhysics.MassAPI):
+                    UsdPhysics.MassAPI.Apply(prim)
+                if not prim.HasAPI(UsdPhysics.RigidBodyAPI):
+                    UsdPhysics.RigidBodyAPI.Apply(prim)
+            return {
+                "mass": UsdPhysics.MassAPI(prim).GetMassAttr(),
+                "velocity": UsdPhysics.RigidBodyAPI(prim).GetVelocityAttr(),
+                "color": cls._display_color_attr(prim),
+                "name_len": len(prim.GetName()),
+            }
+
+        if kind == "surface":
+            mat_api = UsdPhysics.MaterialAPI(prim)
+            if ensure_apis:
+                if not prim.HasAPI(UsdPhysics.MaterialAPI):
+                    mat_api = UsdPhysics.MaterialAPI.Apply(prim)
+                return {
+                    "static_friction": mat_api.CreateStaticFrictionAttr(),
+                    "dynamic_friction": mat_api.CreateDynamicFrictionAttr(),
+                    "restitution": mat_api.CreateRestitutionAttr(),
+                    "color": cls._display_color_attr(prim),
+                    "name_len": len(prim.GetName()),
+                }
+            return {
+                "static_friction": mat_api.GetStaticFrictionAttr(),
+                "dynamic_friction": mat_api.GetDynamicFrictionAttr(),
+                "restitution": mat_api.GetRestitutionAttr(),
+                "color": cls._display_color_attr(prim),
+                "name_len": len(prim.GetName()),
+            }
+
+        return {
+            "color": cls._display_color_attr(prim),
+            "name_len": len(prim.GetName()),
+        }
 
-    def _apply_dynamic_overrides(self, prim, data):
+    def _author_variant_layer(self, variation_data: Dict[str, Any]):
+        """
+        Author one variant's overrides into an anonymous layer.
+
+        The worker stage sublayers the master's root layer so the base
+        topology composes, while every edit lands in the anonymous layer.
+        Safe to run from a thread pool: each worker owns its stage and
+        layer, and only reads shared state.
+        """
+        override_layer = Sdf.Layer.CreateAnonymous("variant_overrides.usda")
+        override_layer.subLayerPaths.append(self.stage.GetRootLayer().identifier)
+        work_stage = Usd.Stage.Open(override_layer)
+
+        # Stage-level handles (physics scene, lights), resolved once per layer
+        scene_prim = work_stage.GetPrimAtPath("/World/PhysicsScene")
+        dome_prim = work_stage.GetPrimAtPath("/World/DomeLight")
+        key_prim = work_stage.GetPrimAtPath("/World/KeyLight")
+        stage_attrs = {
+            "gravity": (
+                scene_prim.GetAttribute("physics:gravityMagnitude")
+                if scene_prim.IsValid() else None
+            ),
+            "dome_intensity": (
+                UsdLux.DomeLight(dome_prim).GetIntensityAttr()
+                if dome_prim.IsValid() else None
+            ),
+            "key_intensity": (
+                UsdLux.SphereLight(key_prim).GetIntensityAttr()
+                if key_prim.IsValid() else None
+            ),
+            "key_prim": key_prim if key_prim.IsValid() else None,
+            "key_translate": None,
+        }
+        if key_prim.IsValid():
+            translate_attr = key_prim.GetAttribute("xformOp:translate")
+            if translate_attr:
+                stage_attrs["key_translate"] = translate_attr
+
+        # Re-resolve the cached plan against this worker's stage; the API
+        # schemas were already applied at the base level by
+        # _build_override_plan, so this is pure attribute resolution
+        plan = []
+        for kind, prim, _ in self._override_plan:
+            work_prim = work_stage.GetPrimAtPath(prim.GetPath())
+            plan.append((kind, work_prim, self._resolve_override_attrs(work_prim, kind)))
+
+        self._author_variation_overrides(variation_data, stage_attrs, plan)
+
+        # Drop the base sublayer: only the override opinions should be
+        # copied into the variant
+        del override_layer.subLayerPaths[:]
+        return override_layer
+
+    def _author_variation_overrides(self, data: Dict[str, Any], stage_attrs, plan):
+        """Sets the specific values for the current variant context."""
+        physics = data.get("physics_estimation", {})
+        lighting = data.get("lighting_conditions", {})
+
+        # -- 1. Update Physics Constants --
+        gravity = physics.get("gravity", {"x": 0, "y": -9.81, "z": 0})
+        if stage_attrs["gravity"] is not None:
+            stage_attrs["gravity"].Set(abs(gravity.get('y', -9.81)))
+
+        # -- 2. Update Objects (Layered Randomization Strategy) --
+        # Every prim in a category receives the same values (heuristic:
+        # first physics object), so convert each value to its Gf type
+        # exactly once per variant here rather than once per prim below
+        phy_props = physics.get("objects", [{}])[0]
+        vel = phy_props.get("initial_velocity", {})
+        values = {
+            "mass": phy_props.get("mass", 1.0),
+            "velocity": Gf.Vec3f(vel.get('x', 0), vel.get('y', 0), vel.get('z', 0)),
+            "static_friction": phy_props.get("static_friction", 0.5),
+            "dynamic_friction": phy_props.get("dynamic_friction", 0.5),
+            "restitution": phy_props.get("restitution", 0.5),
+        }
+
+        # One prebuilt VtArray per unique color; prims cycle through
+        # these by name length for a deterministic but varied look.
+        # Caching by value means repeated palette entries share one
+        # array instead of allocating a singleton list per Set()
+        colors = []
+        color_cache = {}
+        for obj in data.get("scene_composition", {}).get("objects", []):
+            color = obj.get("material", {}).get("base_color", {"r": 0.5, "g": 0.5, "b": 0.5})
+            key = (color['r'], color['g'], color['b'])
+            color_vt = color_cache.get(key)
+            if color_vt is None:
+                color_vt = color_cache[key] = Vt.Vec3fArray([Gf.Vec3f(*key)])
+            colors.append(color_vt)
+
+        # Cached plan from _build_override_plan: only Set() calls run here
+        for kind, _prim, attrs in plan:
+            if kind == "dynamic":
+                self._apply_dynamic_overrides(values, colors, attrs)
+            elif kind == "surface":
+                self._apply_surface_overrides(values, colors, attrs)
+            else:
+                self._apply_visual_overrides(colors, attrs)
+
+        # -- 3. Update Lighting --
+        # Once per variant; this used to sit inside the per-prim visual
+        # helper and re-authored the lights O(prims) times
+        dome = lighting.get("dome_light", {})
+        key = lighting.get("key_light", {})
+
+        if stage_attrs["dome_intensity"] is not None:
+            stage_attrs["dome_intensity"].Set(dome.get("intensity", 1000))
+
+        if stage_attrs["key_intensity"] is not None:
+            stage_attrs["key_intensity"].Set(key.get("intensity", 5000))
+            kpos = key.get("position", {})
+            position = Gf.Vec3d(kpos.get('x',5), kpos.get('y',5), kpos.get('z',5))
+            if stage_attrs["key_translate"] is not None:
+                stage_attrs["key_translate"].Set(position)
+            else:
+                # Manual base scenes may lack the pre-authored op order
+                xform = UsdGeom.Xformable(stage_attrs["key_prim"])
+                xform.ClearXformOpOrder()
+                xform.AddTranslateOp().Set(position)
+
+    def _apply_dynamic_overrides(self, values, colors, attrs):
         """Apply physics logic (mass, velocity) to dynamic objects."""
         # Find corresponding physics data (heuristic: use first object for now, or match ID)
         # In specific implementation, you might match "Dynamic_Ball" to json ID "ball"
         # For hackathon robustness, we apply generic randomized physics props
-        
-        phy_props = data.get("physics_estimation", {}).get("objects", [{}])[0]
-        
-        mass_api = UsdPhysics.MassAPI(prim)
-        if not mass_api: mass_api = UsdPhysics.MassAPI.Apply(prim)
-        mass_api.GetMassAttr().Set(phy_props.get("mass", 1.0))
-        
-        rb_api = UsdPhysics.RigidBodyAPI(prim)
-        if not rb_api: rb_api = UsdPhysics.RigidBodyAPI.Apply(prim)
-        vel = phy_props.get("initial_velocity", {})
-        rb_api.GetVelocityAttr().Set(Gf.Vec3f(vel.get('x',0), vel.get('y',0), vel.get('z',0)))
-        
+
+        attrs["mass"].Set(values["mass"])
+        attrs["velocity"].Set(values["velocity"])
+
         # Also apply material
-        self._apply_visual_overrides(prim, data)
+        self._apply_visual_overrides(colors, attrs)
 
-    def _apply_surface_overrides(self, prim, data):
+    def _apply_surface_overrides(self, values, colors, attrs):
         """Apply interaction physics (friction) + visuals."""
-        # Random parameters from the first object in the list for consistency
-        phy_props = data.get("physics_estimation", {}).get("objects", [{}])[0]
-        
-        mat_api = UsdPhysics.MaterialAPI(prim)
-        if not mat_api: mat_api = UsdPhysics.MaterialAPI.Apply(prim)
-        
-        mat_api.CreateStaticFrictionAttr().Set(phy_props.get("static_friction", 0.5))
-        mat_api.CreateDynamicFrictionAttr().Set(phy_props.get("dynamic_friction", 0.5))
-        mat_api.CreateRestitutionAttr().Set(phy_props.get("restitution", 0.5))
-        
-        self._apply_visual_overrides(prim, data)
+        attrs["static_friction"].Set(values["static_friction"])
+        attrs["dynamic_friction"].Set(values["dynamic_friction"])
+        attrs["restitution"].Set(values["restitution"])
+
+        self._apply_visual_overrides(colors, attrs)
 
-    def _apply_visual_overrides(self, prim, data):
+    def _apply_visual_overrides(self, colors, attrs):
         """Apply only color/material overrides."""
-        # Heuristic: Pick a random object's material from the variation
-        objects = data.get("scene_composition", {}).get("objects", [])
-        if objects:
+        color_attr = attrs.get("color")
+        if colors and color_attr is not None:
             # We cycle through objects based on name length to get deterministic but varied look
-            idx = len(prim.GetName()) % len(objects)
-            mat_data = objects[idx].get("material", {})
-            
-            color = mat_data.get("base_color", {"r": 0.5, "g": 0.5, "b": 0.5})
-            
-            gprim = UsdGeom.Gprim(prim)
-            if gprim:
-                gprim.GetDisplayColorAttr().Set([Gf.Vec3f(color['r'], color['g'], color['b'])])
-
-        # -- 3. Update Lighting --
-        dome = lighting.get("dome_light", {})
-        key = lighting.get("key_light", {})
-        
-        dome_prim = self.stage.GetPrimAtPath("/World/DomeLight")
-        if dome_prim:
-            dome_light = UsdLux.DomeLight(dome_prim)
-            dome_light.GetIntensityAttr().Set(dome.get("intensity", 1000))
-            
-        key_prim = self.stage.GetPrimAtPath("/World/KeyLight")
-        if key_prim:
-            key_light = UsdLux.SphereLight(key_prim)
-            key_light.GetIntensityAttr().Set(key.get("intensity", 5000))
-            kpos = key.get("position", {})
-            xform = UsdGeom.Xformable(key_prim)
-            xform.ClearXformOpOrder()
-            xform.AddTranslateOp().Set(Gf.Vec3d(kpos.get('x',5), kpos.get('y',5), kpos.get('z',5)))
+            color_attr.Set(colors[attrs["name_len"] % len(colors)])
 
 
 if __name__ == "__main__":
@@ -272,8 +523,11 @@ if __name__ == "__main__":
     count = int(sys.argv[2]) if len(sys.argv) > 2 else 5
     
     # 1. Load Base
-    with open(json_path, 'r') as f:
-        base_data = json.load(f)
+    if orjson is not None:
+        base_data = orjson.loads(Path(json_path).read_bytes())
+    else:
+        with open(json_path, 'r') as f:
+            base_data = json.load(f)
         
     # 2. Generate Variations in Memory
     randomizer = DomainRandomizer(base_data)
@@ -281,7 +535,7 @@ if __name__ == "__main__":
     
     # 3. Create USD with Variants
     generator = USDVariantGenerator()
-    output_usd = Path("output/usd_scenes/master_scene_variants.usd")
+    output_usd = Path("output/usd_scenes/master_scene_variants.usdc")
     
     try:
         generator.create_variant_stage(base_data, variations, output_usd)
@@ -5,11 +5,23 @@ Uses Gemini API to analyze real-world videos and extract physics parameters
 for recreation in Isaac Sim.
 """
 
+import asyncio
+import hashlib
 import json
 import logging
+import mmap
+import os
+import sys
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 import time
+from functools import cached_property, lru_cache
+from itertools import islice
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 try:
     from llm_provider import get_provider
@@ -20,91 +32,292 @@ from config import (
     GEMINI_API_KEY,  # Still imported for backward compat if needed, but not used directly
     PHYSICS_ANALYSIS_PROMPT,
     OUTPUT_DIR,
-    LLM_PROVIDER
+    LLM_PROVIDER,
+    GEMINI_MODEL,
+    GEMINI_TEMPERATURE,
+    OLLAMA_VISION_MODEL,
+    OLLAMA_TEMPERATURE,
+    ensure_output_dirs,
+    validate_physics_json
 )
 
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Logging configuration is left to the application (main.py or the
+# __main__ block below) — configuring it at import time would override
+# whatever the importer set up
 logger = logging.getLogger(__name__)
 
+# Everything besides the video bytes that determines an analysis result;
+# baked into the cache key so prompt/model/temperature changes miss
+_PROMPT_VERSION = hashlib.sha256(PHYSICS_ANALYSIS_PROMPT.encode()).hexdigest()[:8]
+if LLM_PROVIDER.lower() == "ollama":
+    _CACHE_FINGERPRINT = f"ollama|{OLLAMA_VISION_MODEL}|{OLLAMA_TEMPERATURE}|{_PROMPT_VERSION}"
+else:
+    _CACHE_FINGERPRINT = f"gemini|{GEMINI_MODEL}|{GEMINI_TEMPERATURE}|{_PROMPT_VERSION}"
+
+# Cap on concurrent in-flight provider calls; matched to the account's
+# QPS budget so a large batch doesn't trip rate limits and turn the
+# retry backoff into a cascade that linearizes the whole run
+_MAX_CONCURRENCY = int(os.environ.get("GEMINI_MAX_CONCURRENCY", "4"))
+
 
 class VideoAnalyzer:
     """
     Analyzes videos using Gemini to extract physics parameters.
     """
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, verbose: bool = True):
         """
         Initialize the VideoAnalyzer.
-        
+
         Args:
             api_key: (Deprecated/Optional)
+            verbose: Print per-analysis summaries (automation callers can
+                turn this off to skip the formatting entirely)
         """
-        # We now use the provider factory
-        self.provider = get_provider(LLM_PROVIDER)
-        
-        logger.info(f"✓ Initialized VideoAnalyzer with provider: {LLM_PROVIDER}")
+        self.verbose = verbose
+
+        logger.info("✓ Initialized VideoAnalyzer with provider: %s", LLM_PROVIDER)
+
+    @cached_property
+    def provider(self):
+        """
+        The configured LLM provider, built on first use.
+
+        Constructing the provider imports and configures its SDK, so
+        deferring it keeps cache-hit analyses (which never call the
+        provider) free of the Gemini import cost entirely.
+        """
+        return get_provider(LLM_PROVIDER)
     
     def analyze_video(
         self,
         video_path: str | Path,
-        save_json: bool = True
+        save_json: bool = True,
+        force: bool = False
     ) -> Dict[str, Any]:
         """
         Analyze a video file and extract physics parameters.
-        
+
         Args:
             video_path: Path to the video file
             save_json: Whether to save the analysis as JSON
-            
+            force: Re-run the analysis even if a cached result exists
+
         Returns:
             Dictionary containing scene composition, physics parameters, etc.
         """
         video_path = Path(video_path)
-        
-        if not video_path.exists():
-            raise FileNotFoundError(f"Video not found: {video_path}")
-        
-        logger.info(f"📹 Analyzing video: {video_path.name}")
-        logger.info("⏳ Uploading to Gemini API...")
-        
+
         try:
-            logger.info(f"🤖 Requesting analysis from {LLM_PROVIDER}...")
-            
-            # Use the provider to get the raw string response (JSON)
-            response_text = self.provider.analyze_video(video_path, PHYSICS_ANALYSIS_PROMPT)
-            
-            # Parse JSON response
-            analysis_data = json.loads(response_text)
-            
-            logger.info("✓ Analysis complete!")
-            
-            # Validate required fields
-            self._validate_analysis(analysis_data)
-            
+            analysis_data = self._analyze_core(video_path, force=force)
+
             # Save to file
             if save_json:
-                output_path = OUTPUT_DIR / f"{video_path.stem}_analysis.json"
-                with open(output_path, 'w', encoding='utf-8') as f:
-                    json.dump(analysis_data, f, indent=2)
-                logger.info(f"💾 Saved analysis: {output_path}")
-            
+                self._write_analysis(video_path, analysis_data)
+
             # Print summary
-            self._print_summary(analysis_data)
-            
+            self._print_summary(analysis_data, video_path)
+
             return analysis_data
-            
-        except json.JSONDecodeError as e:
-            logger.error(f"❌ Failed to parse JSON response: {e}")
-            logger.error(f"Raw response: {response.text}")
-            raise
+
         except Exception as e:
-            logger.error(f"❌ Analysis failed: {e}")
+            logger.error("❌ Analysis failed: %s", e)
+            raise
+
+    @staticmethod
+    def _cache_path(video_path: Path) -> Path:
+        """
+        Content-addressed cache location for one video's analysis.
+
+        Keyed by the video bytes plus the provider/model/prompt
+        fingerprint, so any input that could change the result changes
+        the key. The file is memory-mapped and hashed in one update —
+        the kernel pages it straight into blake2b with no intermediate
+        Python buffers.
+        """
+        h = hashlib.blake2b(digest_size=16)
+        with open(video_path, 'rb') as f:
+            try:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    h.update(mm)
+            except (ValueError, OSError):
+                # Empty files (and exotic filesystems) can't be mmapped
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    h.update(chunk)
+        h.update(_CACHE_FINGERPRINT.encode())
+        return OUTPUT_DIR / "cache" / f"{h.hexdigest()}.json"
+
+    def _analyze_core(self, video_path: Path, force: bool = False) -> Dict[str, Any]:
+        """
+        Upload, analyze, parse, and validate one video — no disk writes
+        beyond the memoization cache.
+
+        Split out of analyze_video so batch pipelines can run this stage
+        concurrently while a writer handles serialization and summaries.
+        """
+        if not video_path.exists():
+            raise FileNotFoundError(f"Video not found: {video_path}")
+
+        # Identical video + prompt + model was analyzed before: return the
+        # prior (already validated) result and skip upload + inference
+        cache_path = self._cache_path(video_path)
+        if not force and cache_path.exists():
+            logger.info("♻️  Using cached analysis: %s", cache_path.name)
+            if orjson is not None:
+                return orjson.loads(cache_path.read_bytes())
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+
+        logger.info("📹 Analyzing video: %s", video_path.name)
+        logger.info("🤖 Requesting analysis from %s...", LLM_PROVIDER)
+
+        # Use the provider to get the raw string response (JSON)
+        response_text = self.provider.analyze_video(video_path, PHYSICS_ANALYSIS_PROMPT)
+
+        # Parse JSON response (orjson.JSONDecodeError subclasses the stdlib one)
+        try:
+            if orjson is not None:
+                analysis_data = orjson.loads(response_text)
+            else:
+                analysis_data = json.loads(response_text)
+        except json.JSONDecodeError as e:
+            logger.error("❌ Failed to parse JSON response: %s", e)
+            logger.error("Raw response: %s", response_text)
             raise
+
+        logger.info("✓ Analysis complete!")
+
+        # Validate required fields
+        self._validate_analysis(analysis_data)
+
+        # Memoize for repeat requests (compact: machine-read only)
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        if orjson is not None:
+            cache_path.write_bytes(orjson.dumps(analysis_data))
+        else:
+            with open(cache_path, 'w', encoding='utf-8') as f:
+                json.dump(analysis_data, f)
+
+        return analysis_data
+
+    def _write_analysis(self, video_path: Path, analysis_data: Dict[str, Any]) -> Path:
+        """Serialize one analysis to its JSON file in OUTPUT_DIR."""
+        ensure_output_dirs()
+        output_path = OUTPUT_DIR / f"{video_path.stem}_analysis.json"
+        if orjson is not None:
+            output_path.write_bytes(orjson.dumps(analysis_data, option=orjson.OPT_INDENT_2))
+        else:
+            with open(output_path, 'w', encoding='utf-8') as f:
+                json.dump(analysis_data, f, indent=2)
+        logger.info("💾 Saved analysis: %s", output_path)
+        return output_path
     
+    def analyze_videos(
+        self,
+        video_paths: List[str | Path],
+        save_json: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Analyze several videos concurrently.
+
+        Each video spends most of its wall time waiting on upload and
+        Gemini processing, so running them together finishes in roughly
+        the slowest video's time instead of the sum. The provider SDKs
+        are blocking clients, so each analysis runs in a worker thread
+        via asyncio.to_thread. In-flight provider calls are capped at
+        GEMINI_MAX_CONCURRENCY to stay inside the API's rate limits.
+
+        Args:
+            video_paths: Paths to the video files
+            save_json: Whether to save each analysis as JSON
+
+        Returns:
+            Analysis dictionaries in the same order as video_paths
+        """
+        async def _gather():
+            sem = asyncio.Semaphore(_MAX_CONCURRENCY)
+
+            async def _one(path):
+                async with sem:
+                    return await asyncio.to_thread(self.analyze_video, path, save_json)
+
+            return await asyncio.gather(*(_one(path) for path in video_paths))
+
+        return asyncio.run(_gather())
+
+    def analyze_batch(
+        self,
+        video_paths: List[str | Path],
+        save_json: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Analyze videos through a producer-consumer pipeline.
+
+        Analyzer tasks (upload + inference + validation — almost all
+        waiting on the provider) feed a bounded queue; one writer task
+        drains it, serializing JSON and printing summaries in a worker
+        thread. Disk I/O and formatting for video N overlap the
+        inference of video N+1, and summaries never interleave.
+
+        Args:
+            video_paths: Paths to the video files
+            save_json: Whether to save each analysis as JSON
+
+        Returns:
+            Analysis dictionaries in the same order as video_paths
+        """
+        video_paths = [Path(p) for p in video_paths]
+        results: Dict[Path, Dict[str, Any]] = {}
+
+        async def _writer(write_q):
+            while True:
+                item = await write_q.get()
+                if item is None:
+                    return
+                path, data = item
+                if save_json:
+                    await asyncio.to_thread(self._write_analysis, path, data)
+                await asyncio.to_thread(self._print_summary, data, path)
+
+        async def _analyze_one(path, write_q, sem):
+            async with sem:
+                data = await asyncio.to_thread(self._analyze_core, path)
+            results[path] = data
+            await write_q.put((path, data))
+
+        async def _run():
+            # Bounded so a slow disk can't pile up parsed analyses in memory
+            write_q = asyncio.Queue(maxsize=4)
+            # Created per run: a Semaphore binds to the loop that first
+            # awaits it, and each analyze_batch call runs its own loop
+            sem = asyncio.Semaphore(_MAX_CONCURRENCY)
+
+            async def _producers():
+                await asyncio.gather(
+                    *(_analyze_one(path, write_q, sem) for path in video_paths)
+                )
+                await write_q.put(None)  # all producers done; drain and stop
+
+            # gather + explicit cancellation rather than asyncio.TaskGroup,
+            # which would raise the Python floor from the supported 3.10
+            # to 3.11. Either side failing cancels the other, so a dead
+            # writer can't leave producers blocked on a full queue (or
+            # vice versa on a queue nobody will ever close).
+            tasks = {asyncio.ensure_future(_producers()),
+                     asyncio.ensure_future(_writer(write_q))}
+            done, pending = await asyncio.wait(
+                tasks, return_when=asyncio.FIRST_EXCEPTION
+            )
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.wait(pending)
+            for task in done:
+                task.result()  # re-raise the first failure, if any
+
+        asyncio.run(_run())
+        return [results[path] for path in video_paths]
+
     def _validate_analysis(self, data: Dict[str, Any]) -> None:
         """
         Validate the analysis output has required fields.
@@ -115,24 +328,31 @@ class VideoAnalyzer:
         Raises:
             ValueError: If required fields are missing
         """
-        required_keys = ["scene_composition", "physics_estimation"]
-        
-        for key in required_keys:
-            if key not in data:
-                raise ValueError(f"Missing required field: {key}")
-        
-        # Check objects exist
-        if not data["scene_composition"].get("objects"):
-            raise ValueError("No objects found in scene_composition")
-        
-        if not data["physics_estimation"].get("objects"):
-            raise ValueError("No physics objects found")
+        if validate_physics_json is not None:
+            # Compiled fastjsonschema validator (covers the manual checks below)
+            try:
+                validate_physics_json(data)
+            except Exception as e:
+                raise ValueError(f"Schema validation failed: {e}")
+        else:
+            required_keys = ["scene_composition", "physics_estimation"]
+
+            for key in required_keys:
+                if key not in data:
+                    raise ValueError(f"Missing required field: {key}")
+
+            # Check objects exist
+            if not data["scene_composition"].get("objects"):
+                raise ValueError("No objects found in scene_composition")
+
+            if not data["physics_estimation"].get("objects"):
+                raise ValueError("No physics objects found")
             
         # Motion Estimation validation (Warning only)
-        if "motion_estimation" not in data:
+        motion = data.get("motion_estimation")
+        if motion is None:
             logger.warning("⚠️  'motion_estimation' field missing from analysis")
         else:
-            motion = data["motion_estimation"]
             if not motion.get("static_background"):
                 logger.warning("⚠️  No static_background description found")
             if not motion.get("dynamic_agents"):
@@ -140,95 +360,137 @@ class VideoAnalyzer:
         
         logger.info("✓ Analysis validation passed")
     
-    def _print_summary(self, data: Dict[str, Any]) -> None:
+    def _print_summary(self, data: Dict[str, Any], video_path: Optional[Path] = None) -> None:
         """
         Print a human-readable summary of the analysis.
-        
+
+        Buffered into one stdout write: concurrent batch analyses would
+        otherwise interleave summaries line by line, and 20-40 print
+        calls each take the stdout lock. When stdout is not a terminal
+        (CI, piped logs) the decorated block collapses to one
+        machine-readable JSON line per video.
+
         Args:
             data: Analysis dictionary
+            video_path: Source video, included in the non-TTY record
         """
-        print("\n" + "=" * 60)
-        print("📊 PHYSICS ANALYSIS SUMMARY")
-        print("=" * 60)
-        
+        if not self.verbose:
+            return
+
+        if not sys.stdout.isatty():
+            record = {
+                "path": str(video_path) if video_path is not None else None,
+                "objects": len(data["scene_composition"]["objects"]),
+                "events": len(data.get("event_timeline", ())),
+            }
+            sys.stdout.write(json.dumps(record) + "\n")
+            return
+
+        buf = []
+        buf.append("\n" + "=" * 60)
+        buf.append("📊 PHYSICS ANALYSIS SUMMARY")
+        buf.append("=" * 60)
+
         # Scene composition
         objects = data["scene_composition"]["objects"]
-        print(f"\n🎬 Scene Objects: {len(objects)}")
+        buf.append(f"\n🎬 Scene Objects: {len(objects)}")
         for i, obj in enumerate(objects, 1):
             obj_type = obj.get("type", "unknown")
             obj_id = obj.get("id", f"object_{i}")
-            print(f"   {i}. {obj_id} ({obj_type})")
-        
+            buf.append(f"   {i}. {obj_id} ({obj_type})")
+
         # Physics parameters
         physics_objects = data["physics_estimation"]["objects"]
-        print(f"\n⚛️  Physics Objects: {len(physics_objects)}")
+        buf.append(f"\n⚛️  Physics Objects: {len(physics_objects)}")
         for obj in physics_objects:
             obj_id = obj.get("id", "unknown")
             mass = obj.get("mass", 0)
             restitution = obj.get("restitution", 0)
-            print(f"   • {obj_id}: mass={mass}kg, bounce={restitution}")
-        
+            buf.append(f"   • {obj_id}: mass={mass}kg, bounce={restitution}")
+
+        # Each optional section is probed once: .get() bound to a local
+        # replaces the "in" test plus a second lookup for the value
+
         # Timeline
-        if "event_timeline" in data:
-            timeline = data["event_timeline"]
-            print(f"\n⏱️  Events: {len(timeline)}")
-            for event in timeline[:3]:  # Show first 3 events
+        timeline = data.get("event_timeline")
+        if timeline is not None:
+            buf.append(f"\n⏱️  Events: {len(timeline)}")
+            for event in islice(timeline, 3):  # Show first 3 events
                 frame = event.get("frame", 0)
                 event_type = event.get("event", "unknown")
-                print(f"   Frame {frame}: {event_type}")
-        
+                buf.append(f"   Frame {frame}: {event_type}")
+
         # Lighting
-        if "lighting_conditions" in data:
-            lighting = data["lighting_conditions"]
-            if "dome_light" in lighting:
-                dome_intensity = lighting["dome_light"].get("intensity", 0)
-                print(f"\n💡 Dome Light Intensity: {dome_intensity}")
+        lighting = data.get("lighting_conditions")
+        if lighting is not None:
+            dome_light = lighting.get("dome_light")
+            if dome_light is not None:
+                dome_intensity = dome_light.get("intensity", 0)
+                buf.append(f"\n💡 Dome Light Intensity: {dome_intensity}")
                 # Motion Estimation
-        if "motion_estimation" in data:
-            motion = data["motion_estimation"]
-            print(f"\n🎥 Motion Analysis:")
-            if "static_background" in motion:
-                bg = motion["static_background"]
-                print(f"   • Static Background: {bg.get('description', 'unknown')} (Stability: {bg.get('stability_score', 0)})")
-            
-            if "dynamic_agents" in motion:
-                agents = motion["dynamic_agents"]
-                print(f"   • Dynamic Agents: {len(agents)}")
+        motion = data.get("motion_estimation")
+        if motion is not None:
+            buf.append(f"\n🎥 Motion Analysis:")
+            bg = motion.get("static_background")
+            if bg is not None:
+                buf.append(f"   • Static Background: {bg.get('description', 'unknown')} (Stability: {bg.get('stability_score', 0)})")
+
+            agents = motion.get("dynamic_agents")
+            if agents is not None:
+                buf.append(f"   • Dynamic Agents: {len(agents)}")
                 for agent in agents:
-                    print(f"     - {agent.get('id', 'unknown')}: {agent.get('movement_type', 'unknown')}")
+                    buf.append(f"     - {agent.get('id', 'unknown')}: {agent.get('movement_type', 'unknown')}")
 
         # Physics Reasoning (New)
-        if "physics_reasoning" in data:
-            reasoning = data["physics_reasoning"]
-            print(f"\n🧠 Physics Reasoning (Confidence: {reasoning.get('confidence_score', 'N/A')}):")
-            print(f"   \"{reasoning.get('observation_summary', 'No summary provided.')}\"")
-            
-            if "object_analysis" in reasoning:
-                for obj in reasoning["object_analysis"]:
-                    print(f"   • {obj.get('id', 'unknown')}: {obj.get('material_inference', '')}")
-                    print(f"     - Mass: {obj.get('mass_reasoning', '')}")
-                    print(f"     - Friction: {obj.get('friction_reasoning', '')}")
+        reasoning = data.get("physics_reasoning")
+        if reasoning is not None:
+            buf.append(f"\n🧠 Physics Reasoning (Confidence: {reasoning.get('confidence_score', 'N/A')}):")
+            buf.append(f"   \"{reasoning.get('observation_summary', 'No summary provided.')}\"")
+
+            object_analysis = reasoning.get("object_analysis")
+            if object_analysis is not None:
+                for obj in object_analysis:
+                    buf.append(f"   • {obj.get('id', 'unknown')}: {obj.get('material_inference', '')}")
+                    buf.append(f"     - Mass: {obj.get('mass_reasoning', '')}")
+                    buf.append(f"     - Friction: {obj.get('friction_reasoning', '')}")
+
+        buf.append("\n" + "=" * 60 + "\n")
+        sys.stdout.write("\n".join(buf) + "\n")
+
+
+@lru_cache(maxsize=1)
+def _default_analyzer() -> VideoAnalyzer:
+    """
+    Process-wide default analyzer.
 
-        print("\n" + "=" * 60 + "\n")
+    Sharing one instance keeps the provider (and its configured SDK
+    client/channel) alive across repeated CLI-style calls instead of
+    re-negotiating a connection per video.
+    """
+    return VideoAnalyzer()
 
 
 def analyze_video_cli(video_path: str) -> Dict[str, Any]:
     """
     Command-line interface for video analysis.
-    
+
     Args:
         video_path: Path to video file
-        
+
     Returns:
         Analysis data dictionary
     """
-    analyzer = VideoAnalyzer()
-    return analyzer.analyze_video(video_path)
+    return _default_analyzer().analyze_video(video_path)
 
 
 if __name__ == "__main__":
     import sys
-    
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
     if len(sys.argv) < 2:
         print("Usage: python video_analyzer.py <video_path>")
         print("\nExample:")